@@ -130,6 +130,16 @@ FAKE_FILES = [
     "users.csv",
 ]
 
+# commands whose reply never changes, answered with one dict lookup before
+# falling through to the commands that need per-session handling
+STATIC_REPLIES = {
+    "USER": b"331 Please specify the password.\r\n",
+    "SYST": b"215 UNIX Type: L8\r\n",
+    "PWD": b'257 "/" is the current directory\r\n',
+    "CWD": b"250 Directory successfully changed.\r\n",
+    "TYPE": b"200 Switching to Binary mode.\r\n",
+}
+
 # filled in by main.py or handler.py so we can put events on the queue
 event_queue = None
 
@@ -179,25 +189,14 @@ def handle_session(conn, addr):
 
             log_event(src_ip, "command", cmd)
 
-            if command == "USER":
-                send("331 Please specify the password.")
+            reply = STATIC_REPLIES.get(command)
+            if reply is not None:
+                conn.sendall(reply)
 
             elif command == "PASS":
                 log_event(src_ip, "login_attempt", arg)
                 send("230 Login successful.")
 
-            elif command == "SYST":
-                send("215 UNIX Type: L8")
-
-            elif command == "PWD":
-                send('257 "/" is the current directory')
-
-            elif command == "CWD":
-                send("250 Directory successfully changed.")
-
-            elif command == "TYPE":
-                send("200 Switching to Binary mode.")
-
             elif command == "PASV":
                 # spin up a real temp socket so the client's data connection works
                 if data_server:
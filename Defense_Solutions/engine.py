@@ -19,6 +19,11 @@ _policy = DefensePolicy()
 
 _VALID_SEVERITY = {"low", "medium", "high", "critical"}
 
+# Event types at least one module reacts to. Module output depends on per-source
+# windows and cooldowns, so it can't be memoized per event signature; for every
+# other type the result is always empty and the fan-out can be skipped.
+_ACTIONABLE_EVENT_TYPES = frozenset({"connect.attempt", "port.sweep", "brute.force"})
+
 
 def _normalize_action(action: dict[str, Any], event: dict[str, Any]) -> dict[str, Any]:
     now = float(event.get("timestamp", time.time()))
@@ -48,6 +53,8 @@ def _normalize_action(action: dict[str, Any], event: dict[str, Any]) -> dict[str
 
 def build_defense_actions(event: dict[str, Any]) -> list[dict[str, Any]]:
     """Route one event through all defense modules and collect actions."""
+    if event.get("type") not in _ACTIONABLE_EVENT_TYPES:
+        return []
     actions: list[dict[str, Any]] = []
     event_ts = float(event.get("timestamp", time.time()))
     for module in (_ssh, _http, _ftp):
@@ -59,6 +66,6 @@ def build_defense_actions(event: dict[str, Any]) -> list[dict[str, Any]]:
             )
             if _engine_gate.allow(dedup_key, event_ts):
                 normalized["enforcement"] = _policy.apply_mitigation(normalized)
-                _policy.log_action(normalized)
                 actions.append(normalized)
+    _policy.log_actions(actions)
     return actions
@@ -30,12 +30,21 @@ class DefensePolicy:
         return self.mode == "auto-block"
 
     def log_action(self, action: dict[str, Any]) -> None:
+        self.log_actions([action])
+
+    def log_actions(self, actions: list[dict[str, Any]]) -> None:
+        """Append actions to the JSONL log with a single open and write."""
+        if not actions:
+            return
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
-        payload = dict(action)
-        payload["policy_mode"] = self.mode
+        lines = []
+        for action in actions:
+            payload = dict(action)
+            payload["policy_mode"] = self.mode
+            lines.append(json.dumps(payload, separators=(",", ":"), sort_keys=True))
+            lines.append("\n")
         with self.log_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(payload, separators=(",", ":"), sort_keys=True))
-            f.write("\n")
+            f.write("".join(lines))
 
     def apply_mitigation(self, action: dict[str, Any]) -> dict[str, Any]:
         mitigation = action.get("mitigation")
@@ -14,20 +14,28 @@ from __future__ import annotations
 
 import argparse
 import ast
+import ctypes
+import ctypes.util
 import curses
-import json
 import os
 import queue
 import random
+import selectors
 import socket
 import sys
 import threading
 import time
 import textwrap
-from collections import Counter, defaultdict, deque
-from datetime import datetime
+from collections import Counter, deque
+from functools import lru_cache
+from itertools import accumulate, islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same input
+    from json import loads as json_loads
 
 # Ensure project-root imports work when launched as `python3 TUI/tui.py`.
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -56,39 +64,162 @@ BASE_EVENT_SCORE = {
     "cowrie.session.file_download": 85,
     "cowrie.session.connect": 48,
 }
-
+# Base scores as a tuple indexed by a small per-type id, with the score for
+# unknown types in the last slot.
+EVENT_TYPE_IDS = {event_type: idx for idx, event_type in enumerate(BASE_EVENT_SCORE)}
+BASE_SCORES = (*BASE_EVENT_SCORE.values(), 10)
+UNKNOWN_TYPE_ID = len(BASE_SCORES) - 1
+
+COWRIE_EVENT_TYPES = frozenset(
+    {
+        "cowrie.login.failed",
+        "cowrie.command.input",
+        "cowrie.session.file_download",
+        "cowrie.session.connect",
+    }
+)
 FSSH_BLACKLIST_HOUSEKEEPING_EVENTS = {"loaded", "cleared", "active"}
 SYSTEM_SRC = "system"
+UNTRACKED_SOURCES = frozenset({SYSTEM_SRC, "unknown"})
 CONNECT_BURST_WINDOW_SECONDS = 30.0
 SSH_BURST_WINDOW_SECONDS = 60.0
 SWEEP_BURST_WINDOW_SECONDS = 20.0
+# Fixed spans for the attacks card counters; their bucket windows evict as
+# they go, so one window cannot serve several spans.
+ATTACK_COUNT_WINDOW_SECONDS = 30
+ACTIVE_SOURCE_WINDOW_SECONDS = 60
 THREAT_AVG_WINDOW = 80
 THREAT_PEAK_WINDOW = 20
+# Recency weights for the threat average (newest first) and their running sums.
+THREAT_AVG_WEIGHTS = tuple(0.95 ** idx for idx in range(THREAT_AVG_WINDOW))
+THREAT_AVG_WEIGHT_SUMS = tuple(accumulate(THREAT_AVG_WEIGHTS))
+LOG_ROWS_MAX = 250
+RECENT_EVENTS_MAX = 400
+FOLLOW_POLL_SECONDS = 0.2
+IN_MODIFY = 0x00000002
+LOG_QUEUE_MAX = 10000
+MIN_HEIGHT = 24
+MIN_WIDTH = 100
+CARD_TITLES = {
+    "ports": "Port List",
+    "llm": "LLM Response",
+    "attacks": "Attacks",
+    "logs": "Logs with Threat Level",
+    "actions": "Response (by ID)",
+}
+# Log rows are written as one string per color run; field widths line up
+# with the column headers drawn by render_logs.
+LOG_ROW_SOURCE_FMT = "{:<8} {:<15.15}"
+LOG_ROW_THREAT_FMT = "{:<16.16} {:02d}/99    {}"
+FOOTER_TEXT = "q quit  c clear  j/k or arrows scroll logs  PgUp/PgDn  Home/End"
+
+
+def _window_bucket(window: deque[Any], second: int, span: int, make: Callable[[int], Any]) -> Any | None:
+    """Return the bucket for ``second`` in a window of per-second buckets.
+
+    Buckets stay in second order: a late timestamp gets (or creates) its own
+    bucket rather than the newest one. Returns None for a second more than
+    ``span`` seconds behind the newest bucket, which is outside the window.
+    """
+    if not window or second > window[-1][0]:
+        bucket = make(second)
+        window.append(bucket)
+        return bucket
+    if second < window[-1][0] - span:
+        return None
+    pos = len(window) - 1
+    while pos >= 0 and window[pos][0] > second:
+        pos -= 1
+    if pos >= 0 and window[pos][0] == second:
+        return window[pos]
+    bucket = make(second)
+    window.insert(pos + 1, bucket)
+    return bucket
+
+
+def _count_bucket(second: int) -> list[int]:
+    return [second, 0]
+
+
+def _sources_bucket(second: int) -> tuple[int, set[str]]:
+    return (second, set())
 
 
 class DashboardState:
     def __init__(self, log_file: Path | None = None, trusted_sources: set[str] | None = None) -> None:
         self.started_at = time.time()
+        # Uptime and idle-gap checks use the monotonic clock so a wall-clock
+        # step (NTP, manual change) cannot stretch or cut them short.
+        self._started_mono = time.monotonic()
+        self._last_event_mono: float | None = None
         self.total_events = 0
         self.event_counts: Counter[str] = Counter()
-        self.recent_events: deque[dict[str, Any]] = deque(maxlen=400)
-        self.recent_logs: deque[dict[str, Any]] = deque(maxlen=250)
+        # (timestamp, port) of connect.attempt events among the last
+        # RECENT_EVENTS_MAX events, per source, so burst scoring only walks the
+        # scored source's connects; _connect_order expires them in arrival order.
+        self._recent_connects: dict[str, deque[tuple[float, Any]]] = {}
+        self._connect_order: deque[tuple[int, str]] = deque()
+        # Log pane rows, stored column-wise instead of one dict per row.
+        self.log_ids: deque[int] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_ts: deque[float] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_when: deque[str] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_src: deque[str] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_type: deque[str] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_port: deque[Any] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_score: deque[int] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_response: deque[str] = deque(maxlen=LOG_ROWS_MAX)
+        self.log_response_color: deque[str] = deque(maxlen=LOG_ROWS_MAX)
+        # Bursts land within one second; format the log clock once per second
+        # and share the string across those rows.
+        self._when_second = -1
+        self._when_text = ""
         self.recent_scores: deque[int] = deque(maxlen=300)
-        self.ip_last_seen: dict[str, float] = defaultdict(float)
+        # Sliding windows backing current_attack_count/active_source_count so the
+        # per-frame counters only touch entries that expired since the last call.
+        # Entries are one-second buckets, so memory follows the window length
+        # rather than the event rate.
+        self._attack_window: deque[list[int]] = deque()
+        self._attack_window_total = 0
+        self._active_sources_window: deque[tuple[int, set[str]]] = deque()
+        self._active_sources: Counter[str] = Counter()
         self.recent_actions: deque[dict[str, Any]] = deque(maxlen=120)
+        # Bumped whenever the data behind a dashboard card changes so render()
+        # can skip cards that would come out identical to the last frame.
+        self.ports_version = 0
+        self.logs_version = 0
+        self.actions_version = 0
+        self.debrief_version = 0
+        self._avg_threat_cache: tuple[int, float] | None = None
         self.port_counts: Counter[int] = Counter()
+        # most_common() sorts the whole counter; keep the result until a port
+        # event invalidates it, and track the leading event type as we count.
+        self._top_ports_cache: list[tuple[int, int, str]] | None = None
+        self._top_ports_count = 0
+        self._top_event_type: str | None = None
         self.cowrie_events = 0
         self.next_log_id = 1
         self.log_file = log_file
+        # Held by the ingest worker while it applies a batch and by the render
+        # loop while it reads a frame.
+        self.lock = threading.RLock()
+        # Log lines are written by a background thread so file I/O stays off
+        # the render loop; lines are dropped if the writer falls this far behind.
+        self._log_q: queue.Queue[str | None] = queue.Queue(maxsize=LOG_QUEUE_MAX)
+        self._log_writer: threading.Thread | None = None
+        # Cleared when the writer thread exits so lines stop queueing for it.
+        self._log_writer_running = log_file is not None
+        if log_file is not None:
+            self._log_writer = threading.Thread(target=self._run_log_writer, daemon=True)
+            self._log_writer.start()
         self.debrief: dict[str, Any] = {
             "backend": "heuristic",
             "level": "low",
             "summary": "Waiting for a completed attack session...",
             "actions": ["No recommendations yet."],
         }
-        self.current_attack_events: deque[dict[str, Any]] = deque(maxlen=5000)
         self.current_attack_started_at: float | None = None
         self.current_attack_last_event_at: float | None = None
+        self._reset_attack_stats()
         self.last_completed_attack: dict[str, Any] | None = None
         self.last_report_generated_at: float | None = None
         self.trusted_sources = set(trusted_sources or set())
@@ -117,23 +248,11 @@ class DashboardState:
         recent_ssh = 1 if current_port == 22 else 0
         distinct_ports: set[int] = {current_port} if isinstance(current_port, int) else set()
 
-        for existing in self.recent_events:
-            if str(existing.get("type", "")) != "connect.attempt":
-                continue
-            if str(existing.get("src_ip", "")) != src_ip:
-                continue
-
-            ts_raw = existing.get("timestamp", 0.0)
-            try:
-                ts = float(ts_raw)
-            except (TypeError, ValueError):
-                continue
-
+        for ts, port in self._recent_connects.get(src_ip, ()):
             age = now - ts
             if age < 0:
                 continue
 
-            port = existing.get("port")
             if age <= CONNECT_BURST_WINDOW_SECONDS:
                 recent_connects += 1
             if age <= SSH_BURST_WINDOW_SECONDS and port == 22:
@@ -143,12 +262,11 @@ class DashboardState:
 
         return recent_connects, recent_ssh, len(distinct_ports)
 
-    def _score_event(self, event: dict[str, Any]) -> int:
+    def _score_event(self, event: dict[str, Any], event_type: str) -> int:
         if self._is_trusted_source(event):
             return 0
 
-        event_type = str(event.get("type", "unknown"))
-        base = BASE_EVENT_SCORE.get(event_type, 10)
+        base = BASE_SCORES[EVENT_TYPE_IDS.get(event_type, UNKNOWN_TYPE_ID)]
         if event_type == "fssh.blacklist":
             blacklist_event = str(event.get("event", "")).lower()
             if blacklist_event in FSSH_BLACKLIST_HOUSEKEEPING_EVENTS:
@@ -217,77 +335,188 @@ class DashboardState:
         return ("Open honeypot 1h", "danger")
 
     def add_event(self, event: dict[str, Any]) -> None:
-        event_type = str(event.get("type", "unknown"))
-        src_ip = self._display_src_ip(event)
+        # Types and sources repeat constantly; interning makes the counters,
+        # log columns and windows share one string object per distinct value.
+        event_type = sys.intern(str(event.get("type", "unknown")))
+        src_ip = sys.intern(self._display_src_ip(event))
         ts = float(event.get("timestamp", time.time()))
         port = event.get("port", "-")
-        score = self._score_event(event)
+        score = self._score_event(event, event_type)
         response_text, response_color = self._response_for_score(score)
 
+        log_id = self.next_log_id
+        self.next_log_id = log_id + 1
         self.total_events += 1
-        self.event_counts[event_type] += 1
-        self.recent_events.appendleft(event)
-        self.recent_scores.appendleft(score)
-        if src_ip not in {SYSTEM_SRC, "unknown"} and src_ip not in self.trusted_sources:
-            self.ip_last_seen[src_ip] = ts
-
-        self.recent_logs.appendleft(
-            {
-                "id": self.next_log_id,
-                "timestamp": ts,
-                "src_ip": src_ip,
-                "type": event_type,
-                "port": port,
-                "score": score,
-                "response": response_text,
-                "response_color": response_color,
-            }
-        )
-        self.next_log_id += 1
+        event_counts = self.event_counts
+        event_counts[event_type] += 1
+        top_type = self._top_event_type
+        type_count = event_counts[event_type]
+        if top_type is None or type_count > event_counts[top_type]:
+            self._top_event_type = event_type
+        elif type_count == event_counts[top_type] and event_type != top_type:
+            # Tied: most_common() keeps the type that was counted first.
+            for name in event_counts:
+                if name == event_type or name == top_type:
+                    self._top_event_type = name
+                    break
+        expired = log_id - RECENT_EVENTS_MAX
+        connect_order = self._connect_order
+        while connect_order and connect_order[0][0] <= expired:
+            key = connect_order.popleft()[1]
+            entries = self._recent_connects[key]
+            entries.popleft()
+            if not entries:
+                del self._recent_connects[key]
+        if event_type == "connect.attempt":
+            key = str(event.get("src_ip", ""))
+            entries = self._recent_connects.get(key)
+            if entries is None:
+                entries = self._recent_connects[key] = deque()
+            entries.append((ts if "timestamp" in event else 0.0, event.get("port")))
+            connect_order.append((log_id, key))
+        self.recent_scores.append(score)
+        second = int(ts)
+        attack_bucket = _window_bucket(self._attack_window, second, ATTACK_COUNT_WINDOW_SECONDS, _count_bucket)
+        if attack_bucket is not None:
+            attack_bucket[1] += 1
+            self._attack_window_total += 1
+        if src_ip not in UNTRACKED_SOURCES and src_ip not in self.trusted_sources:
+            sources_bucket = _window_bucket(
+                self._active_sources_window, second, ACTIVE_SOURCE_WINDOW_SECONDS, _sources_bucket
+            )
+            if sources_bucket is not None and src_ip not in sources_bucket[1]:
+                sources_bucket[1].add(src_ip)
+                self._active_sources[src_ip] += 1
+
+        self.log_ids.append(log_id)
+        self.log_ts.append(ts)
+        if second != self._when_second:
+            self._when_second = second
+            self._when_text = time.strftime("%H:%M:%S", time.localtime(second))
+        self.log_when.append(self._when_text)
+        self.log_src.append(src_ip)
+        self.log_type.append(event_type)
+        self.log_port.append(port)
+        self.log_score.append(score)
+        self.log_response.append(response_text)
+        self.log_response_color.append(response_color)
+        self.logs_version += 1
         if isinstance(port, int):
             self.port_counts[port] += 1
+            self.ports_version += 1
+            self._top_ports_cache = None
         if event_type.startswith("cowrie."):
             self.cowrie_events += 1
+            self._cur_cowrie_count += 1
 
         if self.log_file is not None:
             self._write_log_line(
-                f"{int(ts)} id={self.next_log_id - 1} src={src_ip} event={event_type} port={port} score={score} response={response_text}"
+                f"{int(ts)} id={log_id} src={src_ip} event={event_type} port={port} score={score} response={response_text}"
             )
 
         if self.current_attack_started_at is None:
             self.current_attack_started_at = ts
+            self.debrief_version += 1
         self.current_attack_last_event_at = ts
-        self.current_attack_events.append(event)
-
-        for action in build_defense_actions(event):
-            self.recent_actions.appendleft(action)
+        self._last_event_mono = time.monotonic()
+        self._cur_type_counts[event_type] += 1
+        src_raw = event.get("src_ip", "unknown")
+        self._cur_src_counts[src_raw if isinstance(src_raw, str) else str(src_raw)] += 1
+        if isinstance(port, int):
+            self._cur_ports.add(port)
+        self._cur_score_sum += score
+        self._cur_score_count += 1
+        if score > self._cur_score_max:
+            self._cur_score_max = score
+
+    def add_actions(self, actions: list[dict[str, Any]]) -> None:
+        if actions:
+            self.recent_actions.extend(actions)
+            self.actions_version += 1
+
+    def set_debrief(self, debrief: dict[str, Any], generated_at: float) -> None:
+        self.debrief = debrief
+        self.last_report_generated_at = generated_at
+        self.debrief_version += 1
+
+    def set_debrief_summary(self, summary: str) -> None:
+        if self.debrief.get("summary") != summary:
+            self.debrief["summary"] = summary
+            self.debrief_version += 1
 
     def _write_log_line(self, line: str) -> None:
+        if not self._log_writer_running:
+            return
+        try:
+            self._log_q.put_nowait(line)
+        except queue.Full:
+            pass
+
+    def _run_log_writer(self) -> None:
         try:
             self.log_file.parent.mkdir(parents=True, exist_ok=True)
-            with self.log_file.open("a", encoding="utf-8") as f:
-                f.write(line + "\n")
+            f = self.log_file.open("a", encoding="utf-8", buffering=1 << 16)
         except Exception:
-            pass
+            self._log_writer_running = False
+            return
+        with f:
+            while True:
+                # Block for the first line, then take whatever queued up behind it
+                # so bursts become a single write + flush.
+                batch = [self._log_q.get(), *drain_queue(self._log_q)]
+                stop = None in batch
+                try:
+                    f.write("".join(f"{line}\n" for line in batch if line is not None))
+                    f.flush()
+                except Exception:
+                    pass
+                if stop:
+                    return
+
+    def close(self) -> None:
+        """Flush pending log lines and stop the writer thread."""
+        if self._log_writer is None:
+            return
+        self._log_writer_running = False
+        if self._log_writer.is_alive():
+            try:
+                self._log_q.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._log_writer.join(timeout=2.0)
+        self._log_writer = None
 
-    def uptime(self) -> str:
-        seconds = int(time.time() - self.started_at)
+    def uptime(self, mono: float | None = None) -> str:
+        if mono is None:
+            mono = time.monotonic()
+        seconds = int(mono - self._started_mono)
         hours = seconds // 3600
         minutes = (seconds % 3600) // 60
         secs = seconds % 60
         return f"{hours:02}:{minutes:02}:{secs:02}"
 
     def average_weighted_threat(self) -> float:
+        # Only changes when a score is appended, which always bumps logs_version.
+        cached = self._avg_threat_cache
+        if cached is not None and cached[0] == self.logs_version:
+            return cached[1]
+        value = self._average_weighted_threat()
+        self._avg_threat_cache = (self.logs_version, value)
+        return value
+
+    def _average_weighted_threat(self) -> float:
         if not self.recent_scores:
             return 0.0
 
-        recent = list(self.recent_scores)[:THREAT_AVG_WINDOW]
+        recent = list(islice(reversed(self.recent_scores), THREAT_AVG_WINDOW))
         if not recent:
             return 0.0
 
         # Emphasize newer events while still keeping some history.
-        weights = [0.95 ** idx for idx in range(len(recent))]
-        weighted_avg = sum(score * weight for score, weight in zip(recent, weights)) / sum(weights)
+        weighted_avg = (
+            sum(score * weight for score, weight in zip(recent, THREAT_AVG_WEIGHTS))
+            / THREAT_AVG_WEIGHT_SUMS[len(recent) - 1]
+        )
 
         peak_window = recent[:THREAT_PEAK_WINDOW]
         peak_score = max(peak_window) if peak_window else 0
@@ -297,69 +526,109 @@ class DashboardState:
         blended = (weighted_avg * 0.7) + (peak_score * 0.3) + min(20.0, high_count * 2.0)
         return min(99.0, blended)
 
-    def current_attack_count(self, window_seconds: int = 30) -> int:
-        cutoff = time.time() - window_seconds
-        return sum(1 for ev in self.recent_events if float(ev.get("timestamp", 0.0)) >= cutoff)
-
-    def active_source_count(self, window_seconds: int = 60) -> int:
-        cutoff = time.time() - window_seconds
-        return sum(1 for _, ts in self.ip_last_seen.items() if ts >= cutoff)
-
-    def snapshot(self) -> dict[str, Any]:
+    def current_attack_count(self, now: float | None = None) -> int:
+        cutoff = (time.time() if now is None else now) - ATTACK_COUNT_WINDOW_SECONDS
+        window = self._attack_window
+        while window and window[0][0] + 1 <= cutoff:
+            self._attack_window_total -= window.popleft()[1]
+        return self._attack_window_total
+
+    def active_source_count(self, now: float | None = None) -> int:
+        cutoff = (time.time() if now is None else now) - ACTIVE_SOURCE_WINDOW_SECONDS
+        window = self._active_sources_window
+        sources = self._active_sources
+        while window and window[0][0] + 1 <= cutoff:
+            for src_ip in window.popleft()[1]:
+                sources[src_ip] -= 1
+                if sources[src_ip] <= 0:
+                    del sources[src_ip]
+        return len(sources)
+
+    def snapshot(self, now: float | None = None) -> dict[str, Any]:
+        if now is None:
+            now = time.time()
         return {
             "avg_threat": self.average_weighted_threat(),
-            "current_attacks": self.current_attack_count(),
-            "active_sources": self.active_source_count(),
+            "current_attacks": self.current_attack_count(now=now),
+            "active_sources": self.active_source_count(now=now),
             "cowrie_events": self.cowrie_events,
-            "top_event_type": self.event_counts.most_common(1)[0][0] if self.event_counts else "none",
+            "top_event_type": self._top_event_type or "none",
         }
 
-    def maybe_close_attack_session(self, idle_gap_seconds: float = 8.0, min_events: int = 4) -> dict[str, Any] | None:
+    def idle_seconds(self, mono: float | None = None) -> float | None:
+        """Seconds since the last event was ingested, or None with no open session."""
+        if self._last_event_mono is None:
+            return None
+        return (time.monotonic() if mono is None else mono) - self._last_event_mono
+
+    def maybe_close_attack_session(
+        self,
+        idle_gap_seconds: float = 8.0,
+        min_events: int = 4,
+        mono: float | None = None,
+    ) -> dict[str, Any] | None:
         if self.current_attack_last_event_at is None or self.current_attack_started_at is None:
             return None
-        if len(self.current_attack_events) < min_events:
+        if self._cur_score_count < min_events:
             return None
-        if time.time() - self.current_attack_last_event_at < idle_gap_seconds:
+        idle = self.idle_seconds(mono)
+        if idle is None or idle < idle_gap_seconds:
             return None
 
-        events = list(self.current_attack_events)
-        type_counts: Counter[str] = Counter(str(e.get("type", "unknown")) for e in events)
-        source_counts: Counter[str] = Counter(str(e.get("src_ip", "unknown")) for e in events)
-        ports = sorted({int(e["port"]) for e in events if isinstance(e.get("port"), int)})
-        scores = [self._score_event(e) for e in events]
-
+        type_counts = self._cur_type_counts
+        source_counts = self._cur_src_counts
+        event_count = self._cur_score_count
         session = {
             "attack_started_at": self.current_attack_started_at,
             "attack_ended_at": self.current_attack_last_event_at,
             "duration_seconds": round(self.current_attack_last_event_at - self.current_attack_started_at, 2),
-            "event_count": len(events),
-            "avg_threat": (sum(scores) / len(scores)) if scores else 0.0,
-            "max_threat": max(scores) if scores else 0,
-            "cowrie_events": sum(1 for e in events if str(e.get("type", "")).startswith("cowrie.")),
+            "event_count": event_count,
+            "avg_threat": self._cur_score_sum / event_count,
+            "max_threat": self._cur_score_max,
+            "cowrie_events": self._cur_cowrie_count,
             "top_event_type": type_counts.most_common(1)[0][0] if type_counts else "none",
             "top_source": source_counts.most_common(1)[0][0] if source_counts else "none",
             "unique_sources": len(source_counts),
-            "ports_touched": ports[:30],
+            "ports_touched": sorted(self._cur_ports)[:30],
             "event_type_breakdown": dict(type_counts),
         }
 
         self.last_completed_attack = session
-        self.current_attack_events.clear()
+        self._reset_attack_stats()
         self.current_attack_started_at = None
         self.current_attack_last_event_at = None
+        self._last_event_mono = None
+        self.debrief_version += 1
         return session
 
+    def _reset_attack_stats(self) -> None:
+        # Running totals for the open attack session, updated per event in
+        # add_event so closing a session does not walk its events again.
+        self._cur_type_counts: Counter[str] = Counter()
+        self._cur_src_counts: Counter[str] = Counter()
+        self._cur_ports: set[int] = set()
+        self._cur_score_sum = 0
+        self._cur_score_count = 0
+        self._cur_score_max = 0
+        self._cur_cowrie_count = 0
+
     def top_ports(self, count: int = 12) -> list[tuple[int, int, str]]:
-        ranked = self.port_counts.most_common(count)
-        return [(p, c, self.service_by_port.get(p, "unknown")) for p, c in ranked]
+        if self._top_ports_cache is None or self._top_ports_count != count:
+            ranked = self.port_counts.most_common(count)
+            self._top_ports_cache = [(p, c, self.service_by_port.get(p, "unknown")) for p, c in ranked]
+            self._top_ports_count = count
+        return self._top_ports_cache
 
 
-def parse_event_line(line: str) -> dict[str, Any] | None:
+def parse_event_line(line: str, legacy: bool = False) -> dict[str, Any] | None:
     text = line.strip()
     if not text:
         return None
 
-    for parser in (json.loads, ast.literal_eval):
+    # Python dict literals (repr output) are only accepted with --legacy-parse;
+    # literal_eval is orders of magnitude slower than the JSON parser.
+    parsers = (json_loads, ast.literal_eval) if legacy else (json_loads,)
+    for parser in parsers:
         try:
             event = parser(text)
             if isinstance(event, dict):
@@ -371,35 +640,34 @@ def parse_event_line(line: str) -> dict[str, Any] | None:
 
 def parse_cowrie_line(line: str) -> dict[str, Any] | None:
     try:
-        data = json.loads(line.strip())
+        data = json_loads(line.strip())
     except Exception:
         return None
     if not isinstance(data, dict):
         return None
 
-    event_id = str(data.get("eventid", "cowrie.unknown"))
-    src_ip = str(data.get("src_ip", "unknown"))
-    ts = float(data.get("timestamp", time.time())) if isinstance(data.get("timestamp"), (int, float)) else time.time()
+    event_id = data.get("eventid")
+    if not isinstance(event_id, str) or event_id not in COWRIE_EVENT_TYPES:
+        event_id = "cowrie.session.connect"
+    src_ip = data.get("src_ip", "unknown")
+    src_ip = sys.intern(src_ip if isinstance(src_ip, str) else str(src_ip))
+    ts = data.get("timestamp")
+    if not isinstance(ts, (int, float)):
+        ts = time.time()
     dst_port = data.get("dst_port", 22)
     if not isinstance(dst_port, int):
         dst_port = 22
 
-    mapped = {
-        "cowrie.login.failed": "cowrie.login.failed",
-        "cowrie.command.input": "cowrie.command.input",
-        "cowrie.session.file_download": "cowrie.session.file_download",
-        "cowrie.session.connect": "cowrie.session.connect",
-    }
-    event_type = mapped.get(event_id, "cowrie.session.connect")
-    out = {"type": event_type, "src_ip": src_ip, "timestamp": ts, "port": dst_port}
+    out = {"type": event_id, "src_ip": src_ip, "timestamp": float(ts), "port": dst_port}
     if "input" in data:
-        out["command"] = str(data.get("input", ""))[:80]
+        command = data["input"]
+        out["command"] = (command if isinstance(command, str) else str(command))[:80]
     return out
 
 
 def parse_action_line(line: str) -> dict[str, Any] | None:
     try:
-        data = json.loads(line.strip())
+        data = json_loads(line.strip())
     except Exception:
         return None
     if not isinstance(data, dict):
@@ -470,38 +738,44 @@ def start_demo_source(out_q: queue.Queue[dict[str, Any]]) -> threading.Thread:
     event_types = ["connect.attempt", "connect.attempt", "arp.scan", "port.sweep", "brute.force"]
 
     def run() -> None:
+        choice = random.choice
+        sample = random.sample
+        randint = random.randint
+        uniform = random.uniform
+        clock = time.time
+        sleep = time.sleep
+        put = out_q.put
+        max_sweep = min(7, len(targets))
         while True:
-            now = time.time()
-            event_type = random.choice(event_types)
-            port = random.choice(targets)
+            now = clock()
+            event_type = choice(event_types)
+            port = choice(targets)
             event: dict[str, Any] = {
                 "type": event_type,
-                "src_ip": random.choice(attackers),
+                "src_ip": choice(attackers),
                 "timestamp": now,
                 "port": port,
             }
             if event_type == "port.sweep":
-                event["ports"] = random.sample(targets, k=random.randint(3, min(7, len(targets))))
+                event["ports"] = sample(targets, k=randint(3, max_sweep))
                 event["count"] = len(event["ports"])
             if event_type == "arp.scan":
                 event["target"] = "192.168.1.1"
             if event_type == "brute.force":
-                event["count"] = random.randint(10, 30)
+                event["count"] = randint(10, 30)
 
-            out_q.put(event)
-            time.sleep(random.uniform(0.2, 0.8))
+            put(event)
+            sleep(uniform(0.2, 0.8))
 
     thread = threading.Thread(target=run, daemon=True)
     thread.start()
     return thread
 
 
-def start_stdin_source(out_q: queue.Queue[dict[str, Any]]) -> threading.Thread:
-    import sys
-
+def start_stdin_source(out_q: queue.Queue[dict[str, Any]], legacy: bool = False) -> threading.Thread:
     def run() -> None:
         for line in sys.stdin:
-            event = parse_event_line(line)
+            event = parse_event_line(line, legacy)
             if event is not None:
                 out_q.put(event)
 
@@ -510,64 +784,84 @@ def start_stdin_source(out_q: queue.Queue[dict[str, Any]]) -> threading.Thread:
     return thread
 
 
-def start_follow_source(path: Path, out_q: queue.Queue[dict[str, Any]]) -> threading.Thread:
-    def run() -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.touch(exist_ok=True)
-        with path.open("r", encoding="utf-8") as file:
-            file.seek(0, 2)
-            while True:
-                line = file.readline()
-                if not line:
-                    time.sleep(0.2)
-                    continue
-                event = parse_event_line(line)
-                if event is not None:
-                    out_q.put(event)
+def _open_inotify(paths: list[Path]) -> int | None:
+    """Return a non-blocking inotify fd that wakes on writes to any of paths, or None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    for path in paths:
+        if libc.inotify_add_watch(fd, os.fsencode(str(path)), IN_MODIFY) < 0:
+            os.close(fd)
+            return None
+    return fd
 
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-    return thread
 
+def _read_new_lines(tail: list[Any]) -> None:
+    file, parse, out_q, pending = tail
+    for chunk in iter(file.readline, ""):
+        # Waking on every write can catch a line half-written; hold it until
+        # the newline arrives.
+        pending += chunk
+        if not pending.endswith("\n"):
+            break
+        item = parse(pending)
+        pending = ""
+        if item is not None:
+            out_q.put(item)
+    tail[3] = pending
 
-def start_cowrie_source(path: Path, out_q: queue.Queue[dict[str, Any]]) -> threading.Thread:
-    def run() -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.touch(exist_ok=True)
-        with path.open("r", encoding="utf-8") as file:
-            file.seek(0, 2)
-            while True:
-                line = file.readline()
-                if not line:
-                    time.sleep(0.2)
-                    continue
-                event = parse_cowrie_line(line)
-                if event is not None:
-                    out_q.put(event)
 
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-    return thread
+class FileFollower:
+    """Tail any number of line-oriented files from a single thread.
 
+    Every file is watched through one inotify descriptor registered with a
+    selector, so the thread sleeps until one of them is written to.
+    """
 
-def start_actions_source(path: Path, out_q: queue.Queue[dict[str, Any]]) -> threading.Thread:
-    def run() -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.touch(exist_ok=True)
-        with path.open("r", encoding="utf-8") as file:
+    def __init__(self) -> None:
+        self._sources: list[tuple[Path, Callable[[str], dict[str, Any] | None], queue.Queue[dict[str, Any]]]] = []
+
+    def add(self, path: Path, parse: Callable[[str], dict[str, Any] | None], out_q: queue.Queue[dict[str, Any]]) -> None:
+        self._sources.append((path, parse, out_q))
+
+    def start(self) -> threading.Thread | None:
+        if not self._sources:
+            return None
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self) -> None:
+        tails: list[list[Any]] = []
+        for path, parse, out_q in self._sources:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch(exist_ok=True)
+            file = path.open("r", encoding="utf-8")
             file.seek(0, 2)
-            while True:
-                line = file.readline()
-                if not line:
-                    time.sleep(0.2)
-                    continue
-                action = parse_action_line(line)
-                if action is not None:
-                    out_q.put(action)
+            tails.append([file, parse, out_q, ""])
 
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-    return thread
+        notify_fd = _open_inotify([path for path, _, _ in self._sources])
+        selector = selectors.DefaultSelector()
+        if notify_fd is not None:
+            selector.register(notify_fd, selectors.EVENT_READ)
+        while True:
+            for tail in tails:
+                _read_new_lines(tail)
+            if notify_fd is None:
+                time.sleep(FOLLOW_POLL_SECONDS)
+                continue
+            # The timeout is only a safety net; IN_MODIFY wakes us as soon as data lands.
+            if selector.select(timeout=1.0):
+                try:
+                    os.read(notify_fd, 4096)
+                except BlockingIOError:
+                    pass
 
 
 def safe_addstr(win: curses.window, y: int, x: int, text: str, attr: int = 0) -> None:
@@ -577,7 +871,13 @@ def safe_addstr(win: curses.window, y: int, x: int, text: str, attr: int = 0) ->
     available = max(0, w - x - 1)
     if available <= 0:
         return
-    win.addstr(y, x, text[:available], attr)
+    win.addnstr(y, x, text, available, attr)
+
+
+@lru_cache(maxsize=512)
+def _wrap(text: str, width: int) -> tuple[str, ...]:
+    # Debrief and action text is mostly unchanged between frames.
+    return tuple(textwrap.wrap(text, width=width, break_long_words=True, break_on_hyphens=True)) or ("",)
 
 
 def add_wrapped_text(
@@ -591,7 +891,7 @@ def add_wrapped_text(
 ) -> int:
     if width <= 0:
         return 0
-    lines = textwrap.wrap(text, width=width, break_long_words=True, break_on_hyphens=True) or [""]
+    lines = _wrap(text, width)
     if max_lines is not None:
         lines = lines[:max_lines]
     for idx, line in enumerate(lines):
@@ -626,37 +926,43 @@ def init_colors() -> dict[str, int]:
     }
 
 
-def draw_card(stdscr: curses.window, y: int, x: int, h: int, w: int, title: str, colors: dict[str, int]) -> None:
+def draw_card(
+    stdscr: curses.window,
+    y: int,
+    x: int,
+    h: int,
+    w: int,
+    title: str,
+    colors: dict[str, int],
+    max_h: int,
+    max_w: int,
+) -> None:
+    """Draw a card frame; max_h/max_w are the window size, looked up once by the caller."""
     if h < 3 or w < 4:
         return
-    for ix in range(x, x + w):
-        if y < stdscr.getmaxyx()[0]:
-            stdscr.addch(y, ix, ord(" "))
+    bottom = y + h - 1
+    right = x + w - 1
+    # hline/vline fill a run of cells in one call and leave the cursor in place.
+    if y < max_h and x < max_w:
+        stdscr.hline(y, x, ord(" "), min(w, max_w - x))
     safe_addstr(stdscr, y, x + 2, f" {title} ", colors["title"])
-    for iy in range(y, y + h):
-        if iy < stdscr.getmaxyx()[0]:
-            if x < stdscr.getmaxyx()[1]:
-                stdscr.addch(iy, x, ord("|"), colors["dim"])
-            if x + w - 1 < stdscr.getmaxyx()[1]:
-                stdscr.addch(iy, x + w - 1, ord("|"), colors["dim"])
-    for ix in range(x, x + w):
-        if y + h - 1 < stdscr.getmaxyx()[0]:
-            stdscr.addch(y + h - 1, ix, ord("-"), colors["dim"])
-    if y + h - 1 < stdscr.getmaxyx()[0] and x < stdscr.getmaxyx()[1]:
-        stdscr.addch(y + h - 1, x, ord("+"), colors["dim"])
-    if y + h - 1 < stdscr.getmaxyx()[0] and x + w - 1 < stdscr.getmaxyx()[1]:
-        stdscr.addch(y + h - 1, x + w - 1, ord("+"), colors["dim"])
-
-
-def render(stdscr: curses.window, state: DashboardState, mode_label: str, colors: dict[str, int], log_scroll: int) -> None:
-    stdscr.erase()
-    height, width = stdscr.getmaxyx()
-    if height < 24 or width < 100:
-        safe_addstr(stdscr, 1, 2, "Terminal too small. Resize to at least 100x24.", colors["warn"])
-        safe_addstr(stdscr, 3, 2, "Press q to quit.", colors["dim"])
-        stdscr.refresh()
-        return
-
+    side_rows = min(bottom, max_h) - y
+    if side_rows > 0:
+        if x < max_w:
+            stdscr.vline(y, x, ord("|") | colors["dim"], side_rows)
+        if right < max_w:
+            stdscr.vline(y, right, ord("|") | colors["dim"], side_rows)
+    if bottom < max_h:
+        if x < max_w:
+            stdscr.hline(bottom, x, ord("-") | colors["dim"], min(w - 1, max_w - x))
+            stdscr.addch(bottom, x, ord("+"), colors["dim"])
+        if right < max_w:
+            # insch: addch into a window's bottom-right cell fails moving the cursor off it.
+            stdscr.insch(bottom, right, ord("+"), colors["dim"])
+
+
+def card_layout(height: int, width: int) -> dict[str, tuple[int, int, int, int]]:
+    """Return (y, x, h, w) for every dashboard card on a height x width screen."""
     left_w = 34
     right_x = left_w + 1
     right_w = width - right_x - 1
@@ -667,94 +973,151 @@ def render(stdscr: curses.window, state: DashboardState, mode_label: str, colors
     right_mid_h = max(9, int((height - right_top_h) * 0.58))
     right_bottom_h = height - right_top_h - right_mid_h
 
-    draw_card(stdscr, 0, 1, left_top_h, left_w, "Port List", colors)
-    draw_card(stdscr, left_top_h, 1, left_bottom_h, left_w, "LLM Response", colors)
-    draw_card(stdscr, 0, right_x, right_top_h, right_w, "Attacks", colors)
-    draw_card(stdscr, right_top_h, right_x, right_mid_h, right_w, "Logs with Threat Level", colors)
-    draw_card(stdscr, right_top_h + right_mid_h, right_x, right_bottom_h, right_w, "Response (by ID)", colors)
+    return {
+        "ports": (0, 1, left_top_h, left_w),
+        "llm": (left_top_h, 1, left_bottom_h, left_w),
+        "attacks": (0, right_x, right_top_h, right_w),
+        "logs": (right_top_h, right_x, right_mid_h, right_w),
+        "actions": (right_top_h + right_mid_h, right_x, right_bottom_h, right_w),
+    }
+
+
+def create_card_windows(stdscr: curses.window) -> dict[str, curses.window]:
+    """Allocate one window per card plus the footer; empty if the terminal is too small.
+
+    Cards are refreshed with noutrefresh and flushed by a single doupdate, so
+    ncurses only emits the cells that changed since the previous frame.
+    """
+    height, width = stdscr.getmaxyx()
+    if height < MIN_HEIGHT or width < MIN_WIDTH:
+        return {}
+    cards = {name: curses.newwin(h, w, y, x) for name, (y, x, h, w) in card_layout(height, width).items()}
+    # Drawn last so it sits on top of the bottom card borders.
+    cards["footer"] = curses.newwin(1, len(FOOTER_TEXT), height - 1, 2)
+    return cards
 
-    safe_addstr(stdscr, 1, 3, "PORT  HITS  ROLE", colors["title"])
-    for idx, (port, hits, role) in enumerate(state.top_ports(count=max(1, left_top_h - 3))):
+
+def visible_log_rows(cards: dict[str, curses.window]) -> int:
+    """Number of log rows that fit in the logs card (1 when there are no cards)."""
+    if not cards:
+        return 1
+    return max(1, cards["logs"].getmaxyx()[0] - 3)
+
+
+def _begin_card(win: curses.window, name: str, colors: dict[str, int]) -> tuple[int, int]:
+    win.erase()
+    h, w = win.getmaxyx()
+    draw_card(win, 0, 0, h, w, CARD_TITLES[name], colors, h, w)
+    return h, w
+
+
+def render_ports(win: curses.window, state: DashboardState, colors: dict[str, int]) -> None:
+    ports_h, _ = _begin_card(win, "ports", colors)
+    safe_addstr(win, 1, 2, "PORT  HITS  ROLE", colors["title"])
+    for idx, (port, hits, role) in enumerate(state.top_ports(count=max(1, ports_h - 3))):
         row = 2 + idx
-        if row >= left_top_h - 1:
+        if row >= ports_h - 1:
             break
-        safe_addstr(stdscr, row, 3, f"{port:<5} {hits:<5} {role}", colors["base"])
+        safe_addstr(win, row, 2, f"{port:<5} {hits:<5} {role}", colors["base"])
+
 
+def render_llm(win: curses.window, state: DashboardState, colors: dict[str, int]) -> None:
+    llm_h, llm_w = _begin_card(win, "llm", colors)
+    llm_width = max(10, llm_w - 4)
     backend_text = f"Backend: {state.debrief.get('backend', '-')}"
     backend_lines = add_wrapped_text(
-        stdscr,
-        left_top_h + 1,
-        3,
+        win,
+        1,
+        2,
         backend_text,
-        width=max(10, left_w - 4),
+        width=llm_width,
         attr=colors["title"],
         max_lines=2,
     )
     level = str(state.debrief.get("level", "low")).lower()
     level_color = colors["ok"] if level == "low" else colors["warn"] if level in {"medium", "high"} else colors["danger"]
-    level_row = left_top_h + 1 + backend_lines
-    safe_addstr(stdscr, level_row, 3, f"Level: {level.upper()}", level_color)
+    level_row = 1 + backend_lines
+    safe_addstr(win, level_row, 2, f"Level: {level.upper()}", level_color)
     if state.last_report_generated_at is not None:
-        ts = datetime.fromtimestamp(state.last_report_generated_at).strftime("%H:%M:%S")
-        safe_addstr(stdscr, level_row, 16, f"Report @ {ts}", colors["dim"])
+        ts = time.strftime("%H:%M:%S", time.localtime(state.last_report_generated_at))
+        safe_addstr(win, level_row, 15, f"Report @ {ts}", colors["dim"])
     elif state.current_attack_last_event_at is not None:
-        safe_addstr(stdscr, level_row, 16, "Collecting current attack...", colors["dim"])
-    llm_width = max(10, left_w - 4)
+        safe_addstr(win, level_row, 15, "Collecting current attack...", colors["dim"])
     used = add_wrapped_text(
-        stdscr,
+        win,
         level_row + 1,
-        3,
+        2,
         str(state.debrief.get("summary", "")),
         width=llm_width,
         attr=colors["base"],
-        max_lines=max(1, left_bottom_h - 7),
+        max_lines=max(1, llm_h - 7),
     )
     row = level_row + 1 + used
     for item in state.debrief.get("actions", [])[:3]:
-        if row >= height - 2:
+        if row >= llm_h - 2:
             break
-        consumed = add_wrapped_text(stdscr, row, 3, f"- {item}", width=llm_width, attr=colors["base"], max_lines=2)
+        consumed = add_wrapped_text(win, row, 2, f"- {item}", width=llm_width, attr=colors["base"], max_lines=2)
         row += max(1, consumed)
 
-    avg_threat = state.average_weighted_threat()
+
+def render_attacks(
+    win: curses.window,
+    values: tuple[int, int, float, int, str],
+    mode_label: str,
+    colors: dict[str, int],
+) -> None:
+    attacks, sources, avg_threat, total_events, uptime = values
+    _begin_card(win, "attacks", colors)
     avg_color = colors["ok"] if avg_threat < 20 else colors["warn"] if avg_threat < 50 else colors["danger"]
-    safe_addstr(stdscr, 1, right_x + 2, f"Attacks (30s): {state.current_attack_count()}   Sources (60s): {state.active_source_count()}", colors["chip_warn"])
-    safe_addstr(stdscr, 2, right_x + 2, f"Avg threat: {avg_threat:05.2f}/99   Total events: {state.total_events}", avg_color)
-    safe_addstr(stdscr, 3, right_x + 2, f"Mode: {mode_label}   Uptime: {state.uptime()}", colors["base"])
-    safe_addstr(stdscr, 4, right_x + 2, "Policy: 0-19 alert | 20-49 honeypot 15m | 50-99 honeypot 1h", colors["title"])
-
-    safe_addstr(stdscr, right_top_h + 1, right_x + 2, "ID", colors["title"])
-    safe_addstr(stdscr, right_top_h + 1, right_x + 7, "TIME", colors["title"])
-    safe_addstr(stdscr, right_top_h + 1, right_x + 16, "SRC", colors["title"])
-    safe_addstr(stdscr, right_top_h + 1, right_x + 32, "EVENT", colors["title"])
-    safe_addstr(stdscr, right_top_h + 1, right_x + 49, "THREAT", colors["title"])
-    safe_addstr(stdscr, right_top_h + 1, right_x + 58, "RESPONSE", colors["title"])
-
-    mid_rows = max(1, right_mid_h - 3)
-    logs = list(state.recent_logs)
-    max_scroll = max(0, len(logs) - mid_rows)
-    safe_scroll = max(0, min(log_scroll, max_scroll))
-    visible_logs = logs[safe_scroll : safe_scroll + mid_rows]
-    safe_addstr(stdscr, right_top_h + 1, right_x + right_w - 18, f"scroll {safe_scroll}/{max_scroll}", colors["dim"])
-    for idx, log in enumerate(visible_logs):
-        row = right_top_h + 2 + idx
-        when = datetime.fromtimestamp(float(log["timestamp"])).strftime("%H:%M:%S")
-        score = int(log["score"])
-        response = str(log["response"])
-        event_color = colors["ok"] if score < 20 else colors["warn"] if score < 50 else colors["danger"]
-        safe_addstr(stdscr, row, right_x + 2, f"{int(log.get('id', 0)):03}", colors["dim"])
-        safe_addstr(stdscr, row, right_x + 7, when, colors["base"])
-        safe_addstr(stdscr, row, right_x + 16, f"{str(log['src_ip']):<15}", colors["base"])
-        safe_addstr(stdscr, row, right_x + 32, f"{str(log['type']):<16}", event_color)
-        safe_addstr(stdscr, row, right_x + 49, f"{score:02d}/99", event_color)
-        safe_addstr(stdscr, row, right_x + 58, response, event_color)
-
-    base_y = right_top_h + right_mid_h
-    safe_addstr(stdscr, base_y + 1, right_x + 2, "Latest response actions (linked to log IDs):", colors["title"])
-    action_rows = max(1, right_bottom_h - 3)
-    row = base_y + 2
-    for action in list(state.recent_actions):
-        if row >= base_y + 2 + action_rows:
+    safe_addstr(win, 1, 2, f"Attacks (30s): {attacks}   Sources (60s): {sources}", colors["chip_warn"])
+    safe_addstr(win, 2, 2, f"Avg threat: {avg_threat:05.2f}/99   Total events: {total_events}", avg_color)
+    safe_addstr(win, 3, 2, f"Mode: {mode_label}   Uptime: {uptime}", colors["base"])
+    safe_addstr(win, 4, 2, "Policy: 0-19 alert | 20-49 honeypot 15m | 50-99 honeypot 1h", colors["title"])
+
+
+def render_logs(
+    win: curses.window,
+    state: DashboardState,
+    colors: dict[str, int],
+    safe_scroll: int,
+    max_scroll: int,
+) -> None:
+    logs_h, logs_w = _begin_card(win, "logs", colors)
+    safe_addstr(win, 1, 2, "ID", colors["title"])
+    safe_addstr(win, 1, 7, "TIME", colors["title"])
+    safe_addstr(win, 1, 16, "SRC", colors["title"])
+    safe_addstr(win, 1, 32, "EVENT", colors["title"])
+    safe_addstr(win, 1, 49, "THREAT", colors["title"])
+    safe_addstr(win, 1, 58, "RESPONSE", colors["title"])
+
+    mid_rows = max(1, logs_h - 3)
+    columns = (
+        state.log_ids,
+        state.log_when,
+        state.log_src,
+        state.log_type,
+        state.log_score,
+        state.log_response,
+        state.log_response_color,
+    )
+    visible_logs = zip(*(islice(reversed(col), safe_scroll, safe_scroll + mid_rows) for col in columns))
+    safe_addstr(win, 1, logs_w - 18, f"scroll {safe_scroll}/{max_scroll}", colors["dim"])
+    dim = colors["dim"]
+    base = colors["base"]
+    for idx, (log_id, when, src_ip, event_type, score, response, response_color) in enumerate(visible_logs):
+        row = 2 + idx
+        safe_addstr(win, row, 2, f"{log_id:03}", dim)
+        safe_addstr(win, row, 7, LOG_ROW_SOURCE_FMT.format(when, src_ip), base)
+        safe_addstr(win, row, 32, LOG_ROW_THREAT_FMT.format(event_type, score, response), colors[response_color])
+
+
+def render_actions(win: curses.window, state: DashboardState, colors: dict[str, int]) -> None:
+    actions_h, actions_w = _begin_card(win, "actions", colors)
+    safe_addstr(win, 1, 2, "Latest response actions (linked to log IDs):", colors["title"])
+    action_rows = max(1, actions_h - 3)
+    row = 2
+    for action in reversed(state.recent_actions):
+        if row >= 2 + action_rows:
             break
         severity = str(action.get("severity", "low")).upper()
         src = str(action.get("src_ip", "-"))
@@ -768,18 +1131,140 @@ def render(stdscr: curses.window, state: DashboardState, mode_label: str, colors
             enf = ""
         color = colors["ok"] if severity == "LOW" else colors["warn"] if severity in {"MEDIUM", "HIGH"} else colors["danger"]
         consumed = add_wrapped_text(
-            stdscr,
+            win,
             row,
-            right_x + 2,
+            2,
             f"[{severity}] {src} -> {summary}{enf}",
-            width=max(12, right_w - 4),
+            width=max(12, actions_w - 4),
             attr=color,
             max_lines=2,
         )
         row += max(1, consumed)
 
-    safe_addstr(stdscr, height - 1, 2, "q quit  c clear  j/k or arrows scroll logs  PgUp/PgDn  Home/End", colors["dim"])
-    stdscr.refresh()
+
+def render(
+    stdscr: curses.window,
+    cards: dict[str, curses.window],
+    drawn: dict[str, Any],
+    state: DashboardState,
+    mode_label: str,
+    colors: dict[str, int],
+    log_scroll: int,
+    log_rows: int,
+    now: float,
+    mono: float,
+) -> None:
+    """Draw one frame, redrawing only cards whose backing state changed.
+
+    ``drawn`` maps card name to the state version it was last drawn at; the
+    caller resets it whenever the windows or the state object are replaced.
+    ``log_rows`` is the visible log row count, computed when the cards are
+    created rather than every frame. ``now``/``mono`` are the wall and
+    monotonic clock readings the caller took for this frame.
+    """
+    if not cards:
+        stdscr.erase()
+        safe_addstr(stdscr, 1, 2, f"Terminal too small. Resize to at least {MIN_WIDTH}x{MIN_HEIGHT}.", colors["warn"])
+        safe_addstr(stdscr, 3, 2, "Press q to quit.", colors["dim"])
+        stdscr.noutrefresh()
+        curses.doupdate()
+        return
+
+    if drawn.get("ports") != state.ports_version:
+        render_ports(cards["ports"], state, colors)
+        drawn["ports"] = state.ports_version
+    if drawn.get("llm") != state.debrief_version:
+        render_llm(cards["llm"], state, colors)
+        drawn["llm"] = state.debrief_version
+
+    # The attacks card shows live counters; redraw it only when one of the
+    # displayed values moves (at most once a second when idle, for uptime).
+    attack_values = (
+        state.current_attack_count(now=now),
+        state.active_source_count(now=now),
+        round(state.average_weighted_threat(), 2),
+        state.total_events,
+        state.uptime(mono),
+    )
+    if drawn.get("attacks") != attack_values:
+        render_attacks(cards["attacks"], attack_values, mode_label, colors)
+        drawn["attacks"] = attack_values
+
+    max_scroll = max(0, len(state.log_ids) - log_rows)
+    safe_scroll = max(0, min(log_scroll, max_scroll))
+    logs_key = (state.logs_version, safe_scroll)
+    if drawn.get("logs") != logs_key:
+        render_logs(cards["logs"], state, colors, safe_scroll, max_scroll)
+        drawn["logs"] = logs_key
+    if drawn.get("actions") != state.actions_version:
+        render_actions(cards["actions"], state, colors)
+        drawn["actions"] = state.actions_version
+    if "footer" not in drawn:
+        footer = cards["footer"]
+        footer.erase()
+        footer.insstr(0, 0, FOOTER_TEXT, colors["dim"])
+        drawn["footer"] = True
+    # The footer overlaps the llm/actions bottom borders; mark it changed every
+    # frame so it is copied back over them after either card redraws.
+    cards["footer"].touchwin()
+
+    for win in cards.values():
+        win.noutrefresh()
+    curses.doupdate()
+
+
+def drain_queue(q: queue.Queue[Any]) -> list[Any]:
+    """Take everything currently queued under one lock acquisition.
+
+    Equivalent to calling get_nowait() until queue.Empty, without a lock round
+    trip per item or the exception at the end.
+    """
+    with q.mutex:
+        items = list(q.queue)
+        q.queue.clear()
+        q.not_full.notify_all()
+    return items
+
+
+def start_ingest_worker(
+    event_q: queue.Queue[dict[str, Any]],
+    current_state: Callable[[], DashboardState],
+    stop: threading.Event,
+) -> threading.Thread:
+    """Apply queued events to the dashboard state off the render thread."""
+
+    def run() -> None:
+        while not stop.is_set():
+            try:
+                first = event_q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            events: list[dict[str, Any]] = []
+            for item in [first, *drain_queue(event_q)]:
+                # The live scanner queues lists of events; other sources queue one at a time.
+                if isinstance(item, list):
+                    events.extend(item)
+                else:
+                    events.append(item)
+            # Defense evaluation appends to the action log (and may run nft in
+            # auto-block mode), so it happens before the state lock is taken;
+            # the render loop only ever waits on the in-memory updates below.
+            actions = [build_defense_actions(event) for event in events]
+            while True:
+                state = current_state()
+                with state.lock:
+                    # A clear (c) swaps the state object under the old one's
+                    # lock; apply the batch to whichever state is current.
+                    if state is not current_state():
+                        continue
+                    for event, event_actions in zip(events, actions):
+                        state.add_event(event)
+                        state.add_actions(event_actions)
+                break
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
 
 
 def run_dashboard(
@@ -797,57 +1282,72 @@ def run_dashboard(
     state = DashboardState(log_file=log_file, trusted_sources=trusted_sources)
     debrief = LocalDebrief()
     log_scroll = 0
+    # getch() refreshes stdscr if it has pending changes, which would paint over
+    # cards that are not redrawn every frame; start it out synced.
+    stdscr.noutrefresh()
+    cards = create_card_windows(stdscr)
+    log_rows = visible_log_rows(cards)
+    drawn: dict[str, Any] = {}
+    stop_ingest = threading.Event()
+    start_ingest_worker(event_q, lambda: state, stop_ingest)
 
-    while True:
-        while True:
-            try:
-                state.add_event(event_q.get_nowait())
-            except queue.Empty:
-                break
+    try:
         while True:
-            try:
-                state.recent_actions.appendleft(action_q.get_nowait())
-            except queue.Empty:
-                break
-
-        closed_session = state.maybe_close_attack_session(idle_gap_seconds=8.0, min_events=4)
-        if closed_session is not None:
-            state.debrief = debrief.interpret(closed_session)
-            state.last_report_generated_at = time.time()
-        elif state.current_attack_last_event_at is not None:
-            age = time.time() - state.current_attack_last_event_at
-            if age < 8.0:
-                state.debrief["summary"] = (
-                    "Attack in progress. Capturing full session before generating report..."
-                )
-
-        render(stdscr, state, mode_label, colors, log_scroll)
-        key = stdscr.getch()
-        if key in (ord("q"), ord("Q")):
-            return
-        if key in (ord("c"), ord("C")):
-            state = DashboardState(log_file=log_file, trusted_sources=trusted_sources)
-            log_scroll = 0
-            continue
+            mono = time.monotonic()
+            with state.lock:
+                state.add_actions(drain_queue(action_q))
+                closed_session = state.maybe_close_attack_session(idle_gap_seconds=8.0, min_events=4, mono=mono)
+                if closed_session is None:
+                    age = state.idle_seconds(mono)
+                    if age is not None and age < 8.0:
+                        state.set_debrief_summary(
+                            "Attack in progress. Capturing full session before generating report..."
+                        )
+
+            if closed_session is not None:
+                # interpret() may shell out to ollama; keep ingesting meanwhile.
+                report = debrief.interpret(closed_session)
+                with state.lock:
+                    state.set_debrief(report, time.time())
+
+            with state.lock:
+                render(stdscr, cards, drawn, state, mode_label, colors, log_scroll, log_rows, time.time(), mono)
+            key = stdscr.getch()
+            if key in (ord("q"), ord("Q")):
+                return
+            if key == curses.KEY_RESIZE:
+                stdscr.erase()
+                stdscr.noutrefresh()
+                cards = create_card_windows(stdscr)
+                log_rows = visible_log_rows(cards)
+                drawn.clear()
+                continue
+            if key in (ord("c"), ord("C")):
+                old_state = state
+                with old_state.lock:  # the ingest worker re-checks the state under this lock
+                    state = DashboardState(log_file=log_file, trusted_sources=trusted_sources)
+                old_state.close()
+                drawn.clear()
+                log_scroll = 0
+                continue
 
-        height, width = stdscr.getmaxyx()
-        right_top_h = 7
-        right_mid_h = max(9, int((height - right_top_h) * 0.58))
-        mid_rows = max(1, right_mid_h - 3)
-        max_scroll = max(0, len(state.recent_logs) - mid_rows)
-
-        if key in (curses.KEY_DOWN, ord("j"), ord("J")):
-            log_scroll = min(max_scroll, log_scroll + 1)
-        elif key in (curses.KEY_UP, ord("k"), ord("K")):
-            log_scroll = max(0, log_scroll - 1)
-        elif key == curses.KEY_NPAGE:
-            log_scroll = min(max_scroll, log_scroll + 5)
-        elif key == curses.KEY_PPAGE:
-            log_scroll = max(0, log_scroll - 5)
-        elif key == curses.KEY_HOME:
-            log_scroll = 0
-        elif key == curses.KEY_END:
-            log_scroll = max_scroll
+            max_scroll = max(0, len(state.log_ids) - log_rows)
+
+            if key in (curses.KEY_DOWN, ord("j"), ord("J")):
+                log_scroll = min(max_scroll, log_scroll + 1)
+            elif key in (curses.KEY_UP, ord("k"), ord("K")):
+                log_scroll = max(0, log_scroll - 1)
+            elif key == curses.KEY_NPAGE:
+                log_scroll = min(max_scroll, log_scroll + 5)
+            elif key == curses.KEY_PPAGE:
+                log_scroll = max(0, log_scroll - 5)
+            elif key == curses.KEY_HOME:
+                log_scroll = 0
+            elif key == curses.KEY_END:
+                log_scroll = max_scroll
+    finally:
+        stop_ingest.set()
+        state.close()
 
 
 def parse_args() -> argparse.Namespace:
@@ -856,6 +1356,11 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--demo", action="store_true", help="Generate synthetic attack events")
     parser.add_argument("--stdin", action="store_true", help="Read event objects from stdin")
     parser.add_argument("--follow", type=Path, help="Tail a JSONL-like event file")
+    parser.add_argument(
+        "--legacy-parse",
+        action="store_true",
+        help="Also accept Python dict literals on --stdin/--follow (slow)",
+    )
     parser.add_argument(
         "--interface",
         default=os.getenv("GHOSTWALL_INTERFACE", "eth0"),
@@ -933,15 +1438,17 @@ def main() -> int:
     if sum(bool(x) for x in selected) > 1:
         raise SystemExit("Pick one mode: --live OR --demo OR --stdin OR --follow <path>")
 
+    follower = FileFollower()
     mode_label = "live"
     if args.demo:
         start_demo_source(event_q)
         mode_label = "demo"
     elif args.stdin:
-        start_stdin_source(event_q)
+        start_stdin_source(event_q, args.legacy_parse)
         mode_label = "stdin"
     elif args.follow:
-        start_follow_source(args.follow, event_q)
+        legacy = args.legacy_parse
+        follower.add(args.follow, lambda line: parse_event_line(line, legacy), event_q)
         mode_label = f"follow:{args.follow}"
     else:
         live_mode = True
@@ -965,12 +1472,13 @@ def main() -> int:
     if cowrie_path is not None:
         if str(cowrie_path).startswith("/path/to/"):
             raise SystemExit("Replace /path/to/cowrie.json with a real file path (example: /tmp/cowrie.json).")
-        start_cowrie_source(cowrie_path, event_q)
+        follower.add(cowrie_path, parse_cowrie_line, event_q)
         mode_label = f"{mode_label} + cowrie:{cowrie_path}"
 
     if args.actions_follow:
-        start_actions_source(args.actions_follow, action_q)
+        follower.add(args.actions_follow, parse_action_line, action_q)
         mode_label = f"{mode_label} + actions:{args.actions_follow}"
+    follower.start()
 
     try:
         curses.wrapper(run_dashboard, event_q, action_q, mode_label, args.log_file, trusted_sources)
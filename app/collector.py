@@ -1,24 +1,53 @@
 """
 Collector – tails Cowrie's cowrie.json log and normalises each line into an
-Event, then writes it to SQLite.
+Event, feeds it to the scoring windows and queues it for a writer task that
+stores it in SQLite.
 
 Cowrie emits one JSON object per line (JSONL). We track file position across
 iterations so we can tail efficiently without re-reading the whole file.
+On Linux the loop sleeps on an inotify watch and wakes as soon as Cowrie
+writes; elsewhere it falls back to polling the file size.
 """
 from __future__ import annotations
 
 import asyncio
-import json
+import ctypes
+import ctypes.util
 import logging
 import os
+import struct
+import sys
 import time
+from datetime import datetime
 
-from db import insert_event
+import scoring
+from db import dumps_meta, insert_events_bulk
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; stdlib json parses the same input
+    from json import loads as json_loads
 
 logger = logging.getLogger("ghostwall.collector")
 
 COWRIE_LOG_PATH = os.environ.get("COWRIE_LOG_PATH", "/cowrie-logs/cowrie.json")
-POLL_INTERVAL = 2.0  # seconds between tail checks
+POLL_INTERVAL = 2.0  # seconds between tail checks without inotify
+FALLBACK_POLL_INTERVAL = 30.0  # safety-net size check with inotify (NFS, missed rotations)
+
+IN_MODIFY = 0x00000002
+IN_MOVE_SELF = 0x00000800
+IN_DELETE_SELF = 0x00000400
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+# Parsed rows go through a bounded queue to a single writer task, so parsing
+# never waits on SQLite.  Each read of the log is queued as one list of rows.
+# The writer holds a short batch for up to FLUSH_MAX_DELAY so a burst shares
+# one commit, and writes at most FLUSH_CHUNK_ROWS per transaction so API reads
+# can interleave.  A full queue makes the tail loop wait for the writer.
+WRITE_QUEUE_SIZE = 256  # reads, not rows
+FLUSH_MIN_ROWS = 16
+FLUSH_MAX_DELAY = 0.2
+FLUSH_CHUNK_ROWS = 512
 
 
 # ---------------------------------------------------------------------------
@@ -36,36 +65,137 @@ EVENTID_MAP: dict[str, str] = {
     "cowrie.session.file_download": "download",
 }
 
+# Raw Cowrie fields copied into an event's meta when present.
+_META_KEYS = ("username", "password", "input", "session", "version", "url", "outfile")
+
+_event_kind = EVENTID_MAP.get
+_fromisoformat = datetime.fromisoformat
+
 
 def normalise(raw: dict) -> dict | None:
     """Convert a raw Cowrie JSON record into a normalised event dict.
 
     Returns None if the record is not one we care about.
     """
-    eventid = raw.get("eventid", "")
-    kind = EVENTID_MAP.get(eventid)
+    kind = _event_kind(raw.get("eventid", ""))
     if kind is None:
         return None
 
     # Parse timestamp – Cowrie uses ISO-8601 with space separator
     ts_str = raw.get("timestamp", "")
     try:
-        from datetime import datetime, timezone
-        dt = datetime.fromisoformat(ts_str.replace(" ", "T"))
-        ts = dt.timestamp()
+        ts = _fromisoformat(ts_str.replace(" ", "T")).timestamp()
     except Exception:
         ts = time.time()
 
     src_ip = raw.get("src_ip", raw.get("peerIP", "0.0.0.0"))
 
-    meta: dict = {}
-    for key in ("username", "password", "input", "session", "version", "url", "outfile"):
-        if key in raw:
-            meta[key] = raw[key]
+    meta = {key: raw[key] for key in _META_KEYS if key in raw}
 
     return {"ts": ts, "src_ip": src_ip, "kind": kind, "meta": meta}
 
 
+# ---------------------------------------------------------------------------
+# File watching
+# ---------------------------------------------------------------------------
+
+def _inotify_watch(path: str) -> int | None:
+    """Return a non-blocking inotify fd watching path, or None if unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    mask = IN_MODIFY | IN_MOVE_SELF | IN_DELETE_SELF
+    if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+class _LogWatcher:
+    """Wakes the tail loop when the log is written to or rotated away."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fd: int | None = None
+        self._rotated = False
+        self._changed = asyncio.Event()
+
+    def open(self) -> None:
+        self.fd = _inotify_watch(self.path)
+        if self.fd is not None:
+            asyncio.get_running_loop().add_reader(self.fd, self._on_ready)
+        else:
+            logger.info("inotify unavailable, polling %s every %.0fs", self.path, POLL_INTERVAL)
+
+    def close(self) -> None:
+        if self.fd is not None:
+            asyncio.get_running_loop().remove_reader(self.fd)
+            os.close(self.fd)
+            self.fd = None
+
+    def _on_ready(self) -> None:
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        # Watching a single file, so every record is a bare header (len == 0).
+        usable = len(data) - len(data) % _INOTIFY_EVENT.size
+        for _wd, mask, _cookie, _len in _INOTIFY_EVENT.iter_unpack(data[:usable]):
+            if mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                self._rotated = True
+        self._changed.set()
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Wait for the next change (or timeout); return True if the file was rotated away."""
+        if self.fd is None:
+            await asyncio.sleep(POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL))
+            return False
+        try:
+            await asyncio.wait_for(self._changed.wait(), FALLBACK_POLL_INTERVAL if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._changed.clear()
+        if not self._rotated:
+            return False
+        # The watch followed the old inode; re-arm it on the new file.
+        self._rotated = False
+        self.close()
+        while not os.path.exists(self.path):
+            await asyncio.sleep(1)
+        self.open()
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+async def _writer(queue: asyncio.Queue) -> None:
+    """Drain queued event rows into SQLite, one transaction per batch."""
+    rows: list[tuple[float, str, str, str]] = []
+    while True:
+        if not rows:
+            rows = await queue.get()
+            if len(rows) < FLUSH_MIN_ROWS and queue.empty():
+                await asyncio.sleep(FLUSH_MAX_DELAY)
+        while len(rows) < FLUSH_CHUNK_ROWS:
+            try:
+                rows += queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        batch, rows = rows[:FLUSH_CHUNK_ROWS], rows[FLUSH_CHUNK_ROWS:]
+        try:
+            await insert_events_bulk(batch)
+        except Exception as exc:
+            logger.exception("Dropped %d events, insert failed: %s", len(batch), exc)
+
+
 # ---------------------------------------------------------------------------
 # Tail loop
 # ---------------------------------------------------------------------------
@@ -79,44 +209,74 @@ async def tail_log() -> None:
         logger.debug("Log file not found yet, waiting…")
         await asyncio.sleep(5)
 
+    watcher = _LogWatcher(COWRIE_LOG_PATH)
+    watcher.open()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=WRITE_QUEUE_SIZE)
+    writer = asyncio.create_task(_writer(queue), name="collector-writer")
+
     pos = 0
     # Seek to end so we only process new events going forward
     try:
         pos = os.path.getsize(COWRIE_LOG_PATH)
     except OSError:
         pass
+    # Tail of the last read that had no trailing newline yet; a wake-up can
+    # land while Cowrie is halfway through writing a record.
+    pending = b""
+    debug = logger.isEnabledFor(logging.DEBUG)
 
-    while True:
-        try:
-            current_size = os.path.getsize(COWRIE_LOG_PATH)
-        except OSError:
-            await asyncio.sleep(POLL_INTERVAL)
-            continue
-
-        if current_size < pos:
-            # Log rotated
-            logger.info("Log file rotated, resetting position.")
-            pos = 0
-
-        if current_size > pos:
-            with open(COWRIE_LOG_PATH, "r", errors="replace") as fh:
-                fh.seek(pos)
-                new_data = fh.read()
-                pos = fh.tell()
-
-            for line in new_data.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    raw = json.loads(line)
-                except json.JSONDecodeError:
-                    logger.warning("Bad JSON line: %s", line[:120])
-                    continue
-
-                event = normalise(raw)
-                if event:
-                    logger.debug("Event: kind=%s src=%s", event["kind"], event["src_ip"])
-                    await insert_event(event["ts"], event["src_ip"], event["kind"], event["meta"])
-
-        await asyncio.sleep(POLL_INTERVAL)
+    try:
+        while True:
+            try:
+                current_size = os.path.getsize(COWRIE_LOG_PATH)
+            except OSError:
+                await asyncio.sleep(POLL_INTERVAL)
+                continue
+
+            if current_size < pos:
+                # Log rotated
+                logger.info("Log file rotated, resetting position.")
+                pos = 0
+                pending = b""
+
+            if current_size > pos:
+                # Read bytes: the JSON parser validates UTF-8 itself, so a
+                # separate decode pass over the buffer is wasted work.
+                with open(COWRIE_LOG_PATH, "rb") as fh:
+                    fh.seek(pos)
+                    new_data = pending + fh.read()
+                    pos = fh.tell()
+                complete, _, pending = new_data.rpartition(b"\n")
+
+                rows = []
+                for line in complete.split(b"\n"):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        raw = json_loads(line)
+                    except ValueError:
+                        logger.warning("Bad JSON line: %s", line[:120].decode(errors="replace"))
+                        continue
+
+                    event = normalise(raw)
+                    if event:
+                        if debug:
+                            logger.debug("Event: kind=%s src=%s", event["kind"], event["src_ip"])
+                        scoring.ingest(event)
+                        rows.append((
+                            event["ts"],
+                            event["src_ip"],
+                            event["kind"],
+                            dumps_meta(event["meta"]),
+                        ))
+                if rows:
+                    await queue.put(rows)
+
+            if await watcher.wait():
+                logger.info("Log file rotated, following the new file.")
+                pos = 0
+                pending = b""
+    finally:
+        watcher.close()
+        writer.cancel()
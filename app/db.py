@@ -8,12 +8,34 @@ snapshots – periodic threat-score snapshots (optional, for timeline graph)
 """
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import sqlite3
 import aiosqlite
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 DB_PATH = os.environ.get("DB_PATH", "/data/shield.db")
 
+# One connection shared by every helper; opening a connection per call starts
+# a new aiosqlite worker thread and re-opens the database file each time.
+_conn: aiosqlite.Connection | None = None
+_conn_lock = asyncio.Lock()
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-64000",  # 64 MiB; the shared connection keeps it warm
+)
+
 # ---------------------------------------------------------------------------
 # Schema
 # ---------------------------------------------------------------------------
@@ -30,6 +52,9 @@ CREATE TABLE IF NOT EXISTS events (
 
 CREATE_EVENTS_IDX = "CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);"
 
+SESSION_EXPR = "json_extract(meta, '$.session')"
+CREATE_EVENTS_SESSION_IDX = f"CREATE INDEX IF NOT EXISTS idx_events_session ON events({SESSION_EXPR});"
+
 CREATE_SNAPSHOTS = """
 CREATE TABLE IF NOT EXISTS snapshots (
     id               INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,72 +69,202 @@ CREATE TABLE IF NOT EXISTS snapshots (
 );
 """
 
+# Event queries select meta through the JSON column converter, so rows come
+# back with meta already decoded and the API handlers do not re-parse it.
+EVENT_COLUMNS = 'id, ts, src_ip, kind, meta AS "meta [JSON]"'
+
 CREATE_SNAPSHOTS_IDX = "CREATE INDEX IF NOT EXISTS idx_snapshots_ts ON snapshots(ts);"
 
 
+def _parse_meta(raw: bytes) -> dict:
+    try:
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:
+        return {}
+
+
+sqlite3.register_converter("JSON", _parse_meta)
+
+
+async def _get_conn() -> aiosqlite.Connection:
+    """Return the shared connection, opening it on first use."""
+    global _conn
+    if _conn is None:
+        async with _conn_lock:
+            if _conn is None:
+                # isolation_level=None: autocommit unless a helper issues BEGIN.
+                conn = await aiosqlite.connect(
+                    DB_PATH,
+                    isolation_level=None,
+                    detect_types=sqlite3.PARSE_COLNAMES,
+                )
+                conn.row_factory = aiosqlite.Row
+                for pragma in CONNECTION_PRAGMAS:
+                    await conn.execute(pragma)
+                _conn = conn
+    return _conn
+
+
 async def init_db() -> None:
-    """Create tables if they don't exist."""
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(CREATE_EVENTS)
-        await db.execute(CREATE_EVENTS_IDX)
-        await db.execute(CREATE_SNAPSHOTS)
-        await db.execute(CREATE_SNAPSHOTS_IDX)
-        await db.commit()
+    """Open the shared connection and create tables if they don't exist."""
+    db = await _get_conn()
+    await db.execute(CREATE_EVENTS)
+    await db.execute(CREATE_EVENTS_IDX)
+    await db.execute(CREATE_EVENTS_SESSION_IDX)
+    await db.execute(CREATE_SNAPSHOTS)
+    await db.execute(CREATE_SNAPSHOTS_IDX)
+
+
+async def close_db() -> None:
+    """Close the shared connection (called on application shutdown)."""
+    global _conn
+    if _conn is not None:
+        conn, _conn = _conn, None
+        await conn.close()
 
 
 # ---------------------------------------------------------------------------
 # Events
 # ---------------------------------------------------------------------------
 
+def dumps_meta(meta: dict) -> str:
+    """Serialize an event's meta dict to the compact JSON stored in events.meta."""
+    if orjson is not None:
+        return orjson.dumps(meta).decode()
+    return json.dumps(meta, separators=(",", ":"))
+
+
 async def insert_event(ts: float, src_ip: str, kind: str, meta: dict) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
+    db = await _get_conn()
+    await db.execute(
+        "INSERT INTO events (ts, src_ip, kind, meta) VALUES (?, ?, ?, ?)",
+        (ts, src_ip, kind, dumps_meta(meta)),
+    )
+
+
+async def insert_events_bulk(rows: list[tuple[float, str, str, str]]) -> None:
+    """Insert (ts, src_ip, kind, meta_json) rows in a single transaction."""
+    if not rows:
+        return
+    db = await _get_conn()
+    await db.execute("BEGIN")
+    try:
+        await db.executemany(
             "INSERT INTO events (ts, src_ip, kind, meta) VALUES (?, ?, ?, ?)",
-            (ts, src_ip, kind, json.dumps(meta)),
+            rows,
         )
-        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
 
 
 async def fetch_events_since(since_ts: float) -> list[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM events WHERE ts >= ? ORDER BY ts DESC", (since_ts,)
-        ) as cursor:
-            rows = await cursor.fetchall()
+    db = await _get_conn()
+    async with db.execute(
+        f"SELECT {EVENT_COLUMNS} FROM events WHERE ts >= ? ORDER BY ts DESC", (since_ts,)
+    ) as cursor:
+        rows = await cursor.fetchall()
     return [dict(r) for r in rows]
 
 
-async def fetch_recent_events(limit: int = 200) -> list[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM events ORDER BY ts DESC LIMIT ?", (limit,)
-        ) as cursor:
-            rows = await cursor.fetchall()
+async def fetch_recent_events(limit: int = 200, since_id: int = 0) -> list[dict]:
+    """Newest ``limit`` events, or with ``since_id`` the events after that id.
+
+    With ``since_id`` the rows come back oldest first, at most ``limit`` of
+    them, as a rowid range scan; a poller that passes the highest id it has
+    seen pages through the delta without skipping rows.
+    """
+    db = await _get_conn()
+    if since_id > 0:
+        query = f"SELECT {EVENT_COLUMNS} FROM events WHERE id > ? ORDER BY id LIMIT ?"
+        params: tuple = (since_id, limit)
+    else:
+        query = f"SELECT {EVENT_COLUMNS} FROM events ORDER BY ts DESC LIMIT ?"
+        params = (limit,)
+    async with db.execute(query, params) as cursor:
+        rows = await cursor.fetchall()
     return [dict(r) for r in rows]
 
 
+async def fetch_recent_sessions(since_ts: float, limit: int = 50) -> list[dict]:
+    """Return the newest ``limit`` sessions since ``since_ts`` with their events.
+
+    Grouping happens in SQLite; only the selected sessions' events are read.
+    Events without a session ID are grouped under "unknown".
+    """
+    db = await _get_conn()
+    async with db.execute(
+        f"""SELECT COALESCE({SESSION_EXPR}, 'unknown') AS sid, MIN(ts) AS start, src_ip
+            FROM events WHERE ts >= ?
+            GROUP BY sid ORDER BY start DESC LIMIT ?""",
+        (since_ts, limit),
+    ) as cursor:
+        heads = await cursor.fetchall()
+    if not heads:
+        return []
+
+    sessions = {
+        r["sid"]: {"session": r["sid"], "src_ip": r["src_ip"], "start": r["start"], "events": []}
+        for r in heads
+    }
+    sids = list(sessions)
+    match = f"{SESSION_EXPR} IN ({', '.join('?' * len(sids))})"
+    if "unknown" in sessions:
+        match = f"({match} OR {SESSION_EXPR} IS NULL)"
+    async with db.execute(
+        f"""SELECT COALESCE({SESSION_EXPR}, 'unknown') AS sid, ts, kind, meta AS "meta [JSON]"
+            FROM events WHERE ts >= ? AND {match} ORDER BY ts DESC""",
+        (since_ts, *sids),
+    ) as cursor:
+        rows = await cursor.fetchall()
+    # Key on the same expression the first query grouped by, so a
+    # "session": null event lands under "unknown" like a missing one.
+    for r in rows:
+        sessions[r["sid"]]["events"].append({"ts": r["ts"], "kind": r["kind"], "meta": r["meta"]})
+    return list(sessions.values())
+
+
 # ---------------------------------------------------------------------------
 # Snapshots
 # ---------------------------------------------------------------------------
 
+SNAPSHOT_COLUMNS = ("ts", "score", "level", "fail_rate", "conn_rate", "unique_ips", "repeat_offenders", "ban_events")
+# One constant SQL string, so sqlite3's statement cache reuses the compiled
+# statement; positional parameters skip the named-parameter lookup.
+INSERT_SNAPSHOT = (
+    f"INSERT INTO snapshots ({', '.join(SNAPSHOT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(SNAPSHOT_COLUMNS))})"
+)
+
+
+def _snapshot_row(snap: dict) -> tuple:
+    return tuple(snap[col] for col in SNAPSHOT_COLUMNS)
+
+
 async def insert_snapshot(snap: dict) -> None:
-    async with aiosqlite.connect(DB_PATH) as db:
-        await db.execute(
-            """INSERT INTO snapshots
-               (ts, score, level, fail_rate, conn_rate, unique_ips, repeat_offenders, ban_events)
-               VALUES (:ts, :score, :level, :fail_rate, :conn_rate, :unique_ips, :repeat_offenders, :ban_events)""",
-            snap,
-        )
-        await db.commit()
+    db = await _get_conn()
+    await db.execute(INSERT_SNAPSHOT, _snapshot_row(snap))
+
+
+async def insert_snapshots_bulk(snaps: list[dict]) -> None:
+    """Insert several snapshots in a single transaction."""
+    if not snaps:
+        return
+    db = await _get_conn()
+    await db.execute("BEGIN")
+    try:
+        await db.executemany(INSERT_SNAPSHOT, [_snapshot_row(s) for s in snaps])
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
 
 
 async def fetch_snapshots(limit: int = 300) -> list[dict]:
-    async with aiosqlite.connect(DB_PATH) as db:
-        db.row_factory = aiosqlite.Row
-        async with db.execute(
-            "SELECT * FROM snapshots ORDER BY ts DESC LIMIT ?", (limit,)
-        ) as cursor:
-            rows = await cursor.fetchall()
+    db = await _get_conn()
+    async with db.execute(
+        "SELECT * FROM snapshots ORDER BY ts DESC LIMIT ?", (limit,)
+    ) as cursor:
+        rows = await cursor.fetchall()
     return [dict(r) for r in rows]
@@ -14,6 +14,8 @@ RED     – extended bans (300 s) + tighten rate limits
 """
 from __future__ import annotations
 
+import heapq
+import ipaddress
 import logging
 import os
 import subprocess
@@ -23,8 +25,11 @@ logger = logging.getLogger("ghostwall.defense")
 
 DRY_RUN: bool = os.environ.get("DRY_RUN", "true").lower() != "false"
 
-# track active bans: ip -> expiry timestamp
+# track active bans: ip -> expiry on the monotonic clock (immune to NTP steps)
 _active_bans: dict[str, float] = {}
+# (expiry, ip) min-heap so expiry only touches bans that are due; an entry is
+# stale (and skipped) if _active_bans holds a different expiry for the IP.
+_ban_heap: list[tuple[float, str]] = []
 
 BAN_DURATION = {
     "ORANGE": 60,    # seconds
@@ -38,29 +43,73 @@ RATE_LIMIT_CONN = {
 }
 
 
-def _nft_ban(ip: str, duration: int) -> None:
-    """Add a temporary nftables drop rule for an IP."""
+# Bans live in nftables sets with per-element timeouts, so the kernel drops
+# expired entries itself.  Setup follows the add/flush pattern used for the
+# SSH redirect table: safe to re-run, and the drop rules are never duplicated.
+NFT_SETUP = """\
+add table inet ghostwall
+add chain inet ghostwall input { type filter hook input priority 0; policy accept; }
+add set inet ghostwall blocks { type ipv4_addr; flags timeout; }
+add set inet ghostwall blocks6 { type ipv6_addr; flags timeout; }
+flush chain inet ghostwall input
+add rule inet ghostwall input ip saddr @blocks drop
+add rule inet ghostwall input ip6 saddr @blocks6 drop
+"""
+
+_nft_ready = False
+
+
+def _nft_apply(script: str) -> None:
+    """Run an nft script through one `nft -f -` invocation."""
+    subprocess.run(["nft", "-f", "-"], input=script, text=True, check=True, capture_output=True)
+
+
+def _ensure_nft_sets() -> bool:
+    global _nft_ready
+    if not _nft_ready:
+        try:
+            _nft_apply(NFT_SETUP)
+            _nft_ready = True
+        except Exception as exc:
+            logger.warning("nftables setup failed: %s", exc)
+    return _nft_ready
+
+
+def _nft_ban(bans: list[tuple[str, int]]) -> None:
+    """Add temporary nftables blocks for (ip, duration) pairs in one batch."""
+    if not bans:
+        return
     if DRY_RUN:
-        logger.info("[DRY-RUN] Would ban %s for %ds via nftables", ip, duration)
+        for ip, duration in bans:
+            logger.info("[DRY-RUN] Would ban %s for %ds via nftables", ip, duration)
+        return
+    if not _ensure_nft_sets():
+        return
+
+    lines, banned = [], []
+    for ip, duration in bans:
+        try:
+            family_set = "blocks" if ipaddress.ip_address(ip).version == 4 else "blocks6"
+        except ValueError:
+            logger.warning("Not banning %r: not an IP address", ip)
+            continue
+        lines.append(f"add element inet ghostwall {family_set} {{ {ip} timeout {duration}s }}\n")
+        banned.append(ip)
+    if not lines:
         return
     try:
-        # Add drop rule; a real implementation would use a named set + timeout
-        subprocess.run(
-            ["nft", "add", "rule", "inet", "filter", "input",
-             "ip", "saddr", ip, "drop"],
-            check=True, capture_output=True,
-        )
-        logger.info("Banned %s for %ds via nftables", ip, duration)
+        _nft_apply("".join(lines))
+        logger.info("Banned %s via nftables", ", ".join(banned))
     except Exception as exc:
-        logger.warning("nftables ban failed for %s: %s", ip, exc)
+        logger.warning("nftables ban failed for %s: %s", ", ".join(banned), exc)
 
 
 def _nft_unban(ip: str) -> None:
     if DRY_RUN:
         logger.info("[DRY-RUN] Would unban %s via nftables", ip)
         return
-    # Real unban would delete the matching rule handle
-    logger.info("Unbanned %s (nftables rule deletion not yet implemented)", ip)
+    # The set element carries its own timeout; the kernel has already dropped it.
+    logger.info("Ban on %s expired", ip)
 
 
 def _rate_limit(level: str) -> str:
@@ -73,13 +122,18 @@ def _rate_limit(level: str) -> str:
     return msg
 
 
-def expire_bans() -> list[str]:
+def expire_bans(now: float | None = None) -> list[str]:
     """Remove expired bans and return list of unbanned IPs."""
-    now = time.time()
-    expired = [ip for ip, exp in _active_bans.items() if exp <= now]
-    for ip in expired:
+    if now is None:
+        now = time.monotonic()
+    expired: list[str] = []
+    while _ban_heap and _ban_heap[0][0] <= now:
+        exp, ip = heapq.heappop(_ban_heap)
+        if _active_bans.get(ip) != exp:
+            continue
         _nft_unban(ip)
         del _active_bans[ip]
+        expired.append(ip)
     return expired
 
 
@@ -96,7 +150,8 @@ def apply_defense(level: str, top_offenders: list[tuple[str, int]]) -> list[str]
     -------
     List of human-readable action strings taken this cycle.
     """
-    expire_bans()
+    now = time.monotonic()
+    expire_bans(now)
     actions: list[str] = []
 
     if level == "GREEN":
@@ -109,14 +164,16 @@ def apply_defense(level: str, top_offenders: list[tuple[str, int]]) -> list[str]
     if level in ("ORANGE", "RED"):
         duration = BAN_DURATION[level]
         ban_top_n = 3 if level == "ORANGE" else 5
-        now = time.time()
+        new_bans: list[tuple[str, int]] = []
 
         for ip, count in top_offenders[:ban_top_n]:
             if ip in _active_bans:
                 continue  # already banned
             _active_bans[ip] = now + duration
-            _nft_ban(ip, duration)
+            heapq.heappush(_ban_heap, (now + duration, ip))
+            new_bans.append((ip, duration))
             tag = "[DRY-RUN] " if DRY_RUN else ""
             actions.append(f"{tag}Banned {ip} ({count} events) for {duration}s")
+        _nft_ban(new_bans)
 
     return actions
@@ -2,38 +2,52 @@
 GhostWall – FastAPI application entry point.
 
 Starts two background tasks on startup:
-  1. collector.tail_log()  – tails Cowrie JSON log → SQLite
+  1. collector.tail_log()  – tails Cowrie JSON log → SQLite (after
+                             scoring.replay_recent() seeds the windows)
   2. scoring.scoring_loop() – recomputes threat score every N seconds
 
 Exposes:
   GET /              → serves static/index.html
   GET /api/status    → current threat status (score, level, why, actions, metrics)
-  GET /api/events    → recent raw events from SQLite
+  GET /api/events    → recent raw events from SQLite (?since_id=N pages newer ones, oldest first)
   GET /api/timeline  → recent score snapshots for the timeline graph
   GET /api/sessions  → honeypot sessions (login + command events grouped by session)
 """
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import logging.handlers
 import os
+import queue
 import time
 from pathlib import Path
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
+try:
+    import orjson  # noqa: F401 – required by ORJSONResponse
+    from fastapi.responses import ORJSONResponse as RowsResponse
+except ImportError:  # orjson is optional; stdlib json produces the same document
+    RowsResponse = JSONResponse
+
 import db
 import collector
 import scoring
 import defense
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s – %(message)s",
-)
+# Log records are handed to a background listener thread, so the stream
+# write never blocks the event loop.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s – %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # the listener adds the prefix
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger("ghostwall")
 
 app = FastAPI(title="GhostWall", version="0.1.0")
@@ -47,12 +61,26 @@ STATIC_DIR = Path(__file__).parent / "static"
 @app.on_event("startup")
 async def startup() -> None:
     await db.init_db()
-    asyncio.create_task(collector.tail_log(), name="collector")
+    asyncio.create_task(_collect(), name="collector")
     asyncio.create_task(scoring.scoring_loop(), name="scoring")
     asyncio.create_task(_defense_loop(), name="defense")
     logger.info("GhostWall started.")
 
 
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await db.close_db()
+    _log_listener.stop()  # flushes queued records
+
+
+async def _collect() -> None:
+    # Replay the last hour before tailing, so live events reach the scoring
+    # windows after (and never interleaved with) the replayed rows, and no
+    # row the collector writes can be replayed a second time.
+    await scoring.replay_recent()
+    await collector.tail_log()
+
+
 async def _defense_loop() -> None:
     """Run defense module every 10 seconds based on current threat state."""
     while True:
@@ -61,6 +89,7 @@ async def _defense_loop() -> None:
             actions = defense.apply_defense(state.level, state.top_ips)
             if actions:
                 state.actions = actions
+                state.rev += 1
         except Exception as exc:
             logger.exception("Defense loop error: %s", exc)
         await asyncio.sleep(10)
@@ -82,19 +111,39 @@ async def index() -> FileResponse:
 # API endpoints
 # ---------------------------------------------------------------------------
 
+# Serialized /api/status and /api/timeline bodies, keyed by the threat state
+# revision.  The state only changes once per scoring tick, so dashboard polls
+# in between reuse the bytes (or get a 304 when they send the ETag back).
+_status_cache: tuple[int, bytes] | None = None
+_timeline_cache: dict[int, tuple[int, bytes]] = {}
+_BOOT_TAG = f"{time.time():.0f}"  # keeps ETags from a previous run from matching
+
+
+def _cached_response(request: Request, rev: int, body: bytes) -> Response:
+    etag = f'"{_BOOT_TAG}-{rev}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.get("/api/status")
-async def api_status() -> JSONResponse:
+async def api_status(request: Request) -> Response:
+    global _status_cache
     state = scoring.get_state()
-    metrics = dict(state.metrics)
-    return JSONResponse({
-        "score":   state.score,
-        "level":   state.level,
-        "why":     scoring._build_why(metrics),
-        "actions": state.actions,
-        "metrics": metrics,
-        "top_ips":   [{"ip": ip, "count": c} for ip, c in state.top_ips],
-        "top_users": [{"username": u, "count": c} for u, c in state.top_users],
-    })
+    rev = state.rev
+    if _status_cache is None or _status_cache[0] != rev:
+        metrics = dict(state.metrics)
+        body = JSONResponse({
+            "score":   state.score,
+            "level":   state.level,
+            "why":     scoring._build_why(metrics),
+            "actions": state.actions,
+            "metrics": metrics,
+            "top_ips":   [{"ip": ip, "count": c} for ip, c in state.top_ips],
+            "top_users": [{"username": u, "count": c} for u, c in state.top_users],
+        }).body
+        _status_cache = (rev, body)
+    return _cached_response(request, rev, _status_cache[1])
 
 
 @app.post("/api/score/reset")
@@ -106,52 +155,26 @@ async def api_score_reset() -> JSONResponse:
 
 
 @app.get("/api/events")
-async def api_events(limit: int = 200) -> JSONResponse:
-    rows = await db.fetch_recent_events(limit)
-    # Parse meta JSON strings
-    for row in rows:
-        if isinstance(row.get("meta"), str):
-            try:
-                row["meta"] = json.loads(row["meta"])
-            except Exception:
-                pass
-    return JSONResponse(rows)
+async def api_events(limit: int = 200, since_id: int = 0) -> JSONResponse:
+    rows = await db.fetch_recent_events(limit, since_id)  # meta comes back decoded
+    return RowsResponse(rows)
 
 
 @app.get("/api/timeline")
-async def api_timeline(limit: int = 300) -> JSONResponse:
-    rows = await db.fetch_snapshots(limit)
-    rows.reverse()  # chronological order
-    return JSONResponse(rows)
+async def api_timeline(request: Request, limit: int = 300) -> Response:
+    rev = scoring.get_state().rev
+    cached = _timeline_cache.get(limit)
+    if cached is None or cached[0] != rev:
+        rows = await db.fetch_snapshots(limit)
+        rows.reverse()  # chronological order
+        if len(_timeline_cache) >= 8:
+            _timeline_cache.clear()  # odd limits from ad-hoc queries
+        cached = _timeline_cache[limit] = (rev, JSONResponse(rows).body)
+    return _cached_response(request, rev, cached[1])
 
 
 @app.get("/api/sessions")
 async def api_sessions() -> JSONResponse:
     """Return honeypot sessions grouped by session ID."""
     since = time.time() - 86400  # last 24 hours
-    rows = await db.fetch_events_since(since)
-
-    sessions: dict[str, dict] = {}
-    for row in rows:
-        try:
-            meta = json.loads(row["meta"]) if isinstance(row["meta"], str) else row["meta"]
-        except Exception:
-            meta = {}
-
-        sid = meta.get("session", "unknown")
-        if sid not in sessions:
-            sessions[sid] = {
-                "session": sid,
-                "src_ip":  row["src_ip"],
-                "start":   row["ts"],
-                "events":  [],
-            }
-        sessions[sid]["events"].append({
-            "ts":   row["ts"],
-            "kind": row["kind"],
-            "meta": meta,
-        })
-        sessions[sid]["start"] = min(sessions[sid]["start"], row["ts"])
-
-    result = sorted(sessions.values(), key=lambda s: s["start"], reverse=True)
-    return JSONResponse(result[:50])
+    return RowsResponse(await db.fetch_recent_sessions(since, limit=50))
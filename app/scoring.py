@@ -1,8 +1,11 @@
 """
 Threat scoring engine for GhostWall.
 
-Computes a live Threat Score (0–100) from a metrics window derived from
-recent SQLite events, applies slow decay, and labels the result with a level.
+Computes a live Threat Score (0–100) from a metrics window over recent
+events, applies slow decay, and labels the result with a level.  The collector
+feeds each new event to ``ingest``, which keeps rolling per-window counters in
+memory; on startup the last hour is replayed from SQLite (``replay_recent``)
+before the collector starts tailing.
 
 Decay behaviour: when no new activity is detected the score bleeds down
 slowly — roughly a 29-minute half-life — reaching 0 after ~3 hours of
@@ -27,10 +30,9 @@ Weights (must sum to 1.0)
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import time
-from collections import Counter
+from collections import Counter, deque
 from dataclasses import dataclass, field
 
 import db
@@ -44,6 +46,7 @@ logger = logging.getLogger("ghostwall.scoring")
 SCORE_INTERVAL = 5.0    # seconds between score recalculations
 DECAY_FACTOR   = 0.998  # score × decay per interval when idle (~29 min half-life)
 DECAY_FLOOR    = 0.5    # snap to 0 once score falls below this
+REPLAY_CHUNK   = 5000   # startup replay yields to the event loop every N rows
 
 CAPS = {
     "fail_rate":        30.0,
@@ -61,12 +64,16 @@ WEIGHTS = {
     "ban_events":       0.05,
 }
 
-LEVEL_THRESHOLDS = [
+# (metric, weight / cap, weight) resolved once: each term is then
+# min(value * factor, weight), one multiply instead of a divide and a multiply.
+_SCORE_TERMS = tuple((key, weight / CAPS[key], weight) for key, weight in WEIGHTS.items())
+
+LEVEL_THRESHOLDS = (
     (75, "RED"),
     (51, "ORANGE"),
     (26, "YELLOW"),
     (0,  "GREEN"),
-]
+)
 
 
 # ---------------------------------------------------------------------------
@@ -82,6 +89,7 @@ class ThreatState:
     top_users: list[tuple[str, int]] = field(default_factory=list)
     actions: list[str] = field(default_factory=list)
     reset_at: float = 0.0  # epoch time of last manual reset; events before this are ignored
+    rev: int = 0           # bumped whenever the state or the snapshot timeline changes
 
 
 _state = ThreatState()
@@ -100,6 +108,106 @@ def reset_score() -> None:
     _state.score = 0.0
     _state.level = "GREEN"
     _state.reset_at = time.time()
+    _state.rev += 1
+    for window in _WINDOWS:
+        window.clear()
+
+
+# ---------------------------------------------------------------------------
+# Rolling windows (fed by the collector)
+# ---------------------------------------------------------------------------
+
+REPEAT_OFFENDER_MIN = 4  # events from one IP within the window
+
+
+class _Window:
+    """Per-kind, per-IP and per-username counts over the trailing ``seconds`` seconds.
+
+    Every counter is updated by the same append/expire pass, and the number
+    of repeat offenders is tracked as IP counts cross the threshold.  Items
+    are kept in timestamp order (late events are inserted, not appended) so
+    expire() can stop at the first live item.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.items: deque[tuple[float, str, str, str | None]] = deque()
+        self.kinds: Counter[str] = Counter()
+        self.ips: Counter[str] = Counter()
+        self.users: Counter[str] = Counter()
+        self.repeat_offenders = 0
+
+    def add(self, ts: float, kind: str, src_ip: str, username: str | None) -> None:
+        items = self.items
+        item = (ts, kind, src_ip, username)
+        if not items or ts >= items[-1][0]:
+            items.append(item)
+        else:
+            # Late events are rare and usually only a little behind the tail;
+            # walk back from the right end to their slot.
+            pos = len(items) - 1
+            while pos and items[pos - 1][0] > ts:
+                pos -= 1
+            items.insert(pos, item)
+        self.kinds[kind] += 1
+        seen = self.ips[src_ip] + 1
+        self.ips[src_ip] = seen
+        if seen == REPEAT_OFFENDER_MIN:
+            self.repeat_offenders += 1
+        if username:
+            self.users[username] += 1
+
+    def expire(self, now: float) -> None:
+        cutoff = now - self.seconds
+        items = self.items
+        kinds = self.kinds
+        ips = self.ips
+        users = self.users
+        while items and items[0][0] < cutoff:
+            _, kind, src_ip, username = items.popleft()
+            _drop(kinds, kind)
+            if ips[src_ip] == REPEAT_OFFENDER_MIN:
+                self.repeat_offenders -= 1
+            _drop(ips, src_ip)
+            if username:
+                _drop(users, username)
+
+    def clear(self) -> None:
+        self.items.clear()
+        self.kinds.clear()
+        self.ips.clear()
+        self.users.clear()
+        self.repeat_offenders = 0
+
+
+def _drop(counter: Counter[str], key: str) -> None:
+    remaining = counter[key] - 1
+    if remaining > 0:
+        counter[key] = remaining
+    else:
+        del counter[key]
+
+
+_window_60s = _Window(60)
+_window_10m = _Window(600)
+_window_1h  = _Window(3600)
+_WINDOWS = (_window_60s, _window_10m, _window_1h)
+
+
+def ingest(event: dict) -> None:
+    """Count a normalised event (or an events row) into the rolling windows."""
+    ts = event["ts"]
+    if ts < _state.reset_at or ts < time.time() - 3600:
+        return
+    kind = event["kind"]
+    src_ip = event["src_ip"]
+    username = None
+    if kind == "failed_auth":
+        # meta is a dict both from the collector and from db rows (decoded by
+        # the JSON column converter), so there is nothing to parse here.
+        username = (event.get("meta") or {}).get("username") or None
+    for window in _WINDOWS:
+        window.add(ts, kind, src_ip, username)
 
 
 # ---------------------------------------------------------------------------
@@ -113,55 +221,26 @@ def _score_to_level(score: float) -> str:
     return "GREEN"
 
 
-def _compute_metrics(events: list[dict]) -> dict:
-    now = time.time()
-    w60  = now - 60
-    w10m = now - 600
-    w1h  = now - 3600
-
-    fail_events = [e for e in events if e["kind"] == "failed_auth" and e["ts"] >= w60]
-    conn_events = [e for e in events if e["kind"] == "connect"     and e["ts"] >= w60]
-    ips_10m     = {e["src_ip"] for e in events if e["ts"] >= w10m}
-    ban_events  = [e for e in events if e["kind"] == "ban"         and e["ts"] >= w10m]
-
-    # Repeat offenders: IPs with >3 events in last hour
-    ip_counts_1h = Counter(e["src_ip"] for e in events if e["ts"] >= w1h)
-    repeat_off   = sum(1 for c in ip_counts_1h.values() if c > 3)
-
-    # Top offending IPs (last hour)
-    top_ips = ip_counts_1h.most_common(10)
-
-    # Top usernames attempted (last hour)
-    usernames = []
-    for e in events:
-        if e["ts"] >= w1h and e["kind"] == "failed_auth":
-            try:
-                meta = json.loads(e["meta"]) if isinstance(e["meta"], str) else e["meta"]
-                u = meta.get("username")
-                if u:
-                    usernames.append(u)
-            except Exception:
-                pass
-    top_users = Counter(usernames).most_common(10)
+def _compute_metrics(now: float) -> dict:
+    for window in _WINDOWS:
+        window.expire(now)
 
     return {
-        "fail_rate":        len(fail_events),   # events per last 60 s
-        "conn_rate":        len(conn_events),
-        "unique_ips":       len(ips_10m),
-        "repeat_offenders": repeat_off,
-        "ban_events":       len(ban_events),
-        "top_ips":          top_ips,
-        "top_users":        top_users,
+        "fail_rate":        _window_60s.kinds["failed_auth"],   # events per last 60 s
+        "conn_rate":        _window_60s.kinds["connect"],
+        "unique_ips":       len(_window_10m.ips),
+        # Repeat offenders: IPs with >3 events in last hour
+        "repeat_offenders": _window_1h.repeat_offenders,
+        "ban_events":       _window_10m.kinds["ban"],
+        "top_ips":          _window_1h.ips.most_common(10),
+        "top_users":        _window_1h.users.most_common(10),
     }
 
 
 def _compute_raw_score(metrics: dict) -> float:
     raw = 0.0
-    for key, weight in WEIGHTS.items():
-        value = float(metrics.get(key, 0))
-        cap   = CAPS[key]
-        normalised = min(value / cap, 1.0)
-        raw += normalised * weight
+    for key, factor, weight in _SCORE_TERMS:
+        raw += min(metrics.get(key, 0) * factor, weight)
     return round(raw * 100, 2)
 
 
@@ -178,6 +257,25 @@ def _build_why(metrics: dict) -> str:
 # Scoring loop (background asyncio task)
 # ---------------------------------------------------------------------------
 
+async def replay_recent() -> None:
+    """Seed the windows with the last hour so a restart keeps its context.
+
+    Must finish before the collector starts: the windows expect events in
+    time order, and anything the collector writes afterwards is fed to
+    ingest() directly, so the replay never sees it.
+    """
+    try:
+        rows = await db.fetch_events_since(time.time() - 3600)
+        rows.reverse()  # oldest first
+        for start in range(0, len(rows), REPLAY_CHUNK):
+            for row in rows[start:start + REPLAY_CHUNK]:
+                ingest(row)
+            # A busy hour can be large; let the API run in between.
+            await asyncio.sleep(0)
+    except Exception as exc:
+        logger.exception("Could not replay recent events: %s", exc)
+
+
 async def scoring_loop() -> None:
     """Recalculate threat score every SCORE_INTERVAL seconds."""
     global _state
@@ -185,13 +283,11 @@ async def scoring_loop() -> None:
 
     while True:
         try:
-            # Pull events from the last hour, but never before the last manual
-            # reset — this prevents a reset from immediately snapping back to
-            # the pre-reset score because old events are still in the DB.
-            since = max(time.time() - 3600, _state.reset_at)
-            events = await db.fetch_events_since(since)
-
-            metrics = _compute_metrics(events)
+            # Events from before the last manual reset are never ingested (and
+            # reset_score clears the windows), so a reset does not snap back to
+            # the pre-reset score.
+            now     = time.time()
+            metrics = _compute_metrics(now)
             raw     = _compute_raw_score(metrics)
 
             # Slow decay: if activity has subsided, bleed the score down
@@ -220,7 +316,7 @@ async def scoring_loop() -> None:
 
             # Persist snapshot
             snap = {
-                "ts":               time.time(),
+                "ts":               now,
                 "score":            score,
                 "level":            level,
                 "fail_rate":        metrics["fail_rate"],
@@ -230,6 +326,7 @@ async def scoring_loop() -> None:
                 "ban_events":       metrics["ban_events"],
             }
             await db.insert_snapshot(snap)
+            _state.rev += 1
 
         except Exception as exc:
             logger.exception("Scoring loop error: %s", exc)
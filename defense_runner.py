@@ -11,12 +11,16 @@ from __future__ import annotations
 import argparse
 import json
 import queue
-import time
 from typing import Any
 
 import scanner
 from Defense_Solutions.engine import build_defense_actions
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="GhostWall scanner+defense runner")
@@ -25,6 +29,13 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def event_json(event: dict[str, Any]) -> str:
+    """Compact, key-sorted JSON for --show-events output."""
+    if orjson is not None:
+        return orjson.dumps(event, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(event, separators=(",", ":"), sort_keys=True)
+
+
 def format_action(action: dict[str, Any]) -> str:
     source = str(action.get("source", "unknown"))
     severity = str(action.get("severity", "low")).upper()
@@ -41,19 +52,18 @@ def format_action(action: dict[str, Any]) -> str:
 
 def main() -> int:
     args = parse_args()
-    q: "queue.Queue[dict[str, Any]]" = queue.Queue()
+    q: "queue.Queue[list[dict[str, Any]]]" = queue.Queue()
     scanner.start(args.interface, q)
 
     print(f"[runner] interface={args.interface}")
     print("[runner] CTRL+C to stop")
     while True:
-        event = q.get()
-        if args.show_events:
-            print("[event]", json.dumps(event, separators=(",", ":"), sort_keys=True))
-        actions = build_defense_actions(event)
-        for action in actions:
-            print("[action]", format_action(action))
-        time.sleep(0.001)
+        for event in q.get():  # the scanner queues events in batches
+            if args.show_events:
+                print("[event]", event_json(event))
+            actions = build_defense_actions(event)
+            for action in actions:
+                print("[action]", format_action(action))
 
 
 if __name__ == "__main__":
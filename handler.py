@@ -17,9 +17,9 @@ def create_port_config_backup():
         port = socket.getservbyname( service, "tcp")
         service_port_map[ service ] = port
 
+    lines = [f"{name} {number}\n" for name, number in service_port_map.items()]
     with open("original_port_config.txt", "w", encoding="utf-8") as file:
-        for name, number in service_port_map.items():
-            file.writelines(f"{name} {number}\n")
+        file.write("".join(lines))
 
 # Reverts to original config settings for testing safety
 def revert_port_config():
@@ -28,12 +28,34 @@ def revert_port_config():
         # revert to config original
         pass
 
+# Local TCP ports that are listening or bound, read from /proc in one pass
+# instead of one bind() per port. None where /proc/net is not available.
+def get_taken_ports():
+    taken = set()
+    found = False
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(path, encoding="ascii") as file:
+                next(file)  # header
+                for line in file:
+                    fields = line.split()
+                    # 0A = LISTEN, 07 = CLOSE (bound but not listening)
+                    if fields[3] in ("0A", "07"):
+                        taken.add(int(fields[1].rsplit(":", 1)[1], 16))
+            found = True
+        except (OSError, StopIteration):
+            continue
+    return taken if found else None
+
 # To be repeated after port movement
 # (-1,-1) designates error
 def get_free_ports(start=1024, end=MAX_PORT):
-    FREE_PORTS = []
-    for port in range(start, end+1):
-        test_port_freedom(port)
+    global FREE_PORTS
+    taken = get_taken_ports()
+    if taken is None:
+        FREE_PORTS = [port for port in range(start, end+1) if test_port_freedom(port)]
+    else:
+        FREE_PORTS = [port for port in range(start, end+1) if port not in taken]
     return FREE_PORTS
 
 def switch_port(original_port, free_port_1, free_port_2):
@@ -49,6 +71,8 @@ def switch_port(original_port, free_port_1, free_port_2):
 def test_port_freedom(port: int):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.settimeout(0.1)
+        # Ports in TIME_WAIT are reusable; don't report them as taken
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         try:
             s.bind(("0.0.0.0", port))
             return True
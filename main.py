@@ -14,7 +14,6 @@ import json
 import os
 import queue
 import sys
-import time
 from typing import Any
 
 import scanner
@@ -22,6 +21,17 @@ from Defense_Solutions.FTP import ftp as ftp_honeypot
 from Defense_Solutions.engine import build_defense_actions
 from Defense_Solutions.fport import fssh
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# The scanner and honeypots block on put() once this many items (scanner
+# batches or single honeypot events) are waiting, instead of growing the
+# queue without limit while the consumer catches up.
+EVENT_QUEUE_MAX = 10000
+EVENT_BATCH_MAX = 128
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="GhostWall unified runtime")
@@ -92,6 +102,33 @@ def parse_whitelist(value: str) -> list[str]:
     return ips
 
 
+def event_json(event: dict[str, Any]) -> str:
+    """Compact, key-sorted JSON for --show-events output."""
+    if orjson is not None:
+        return orjson.dumps(event, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(event, separators=(",", ":"), sort_keys=True)
+
+
+def next_batch(q: "queue.Queue[Any]") -> list[dict[str, Any]]:
+    """Block for one event, then take whatever else is already queued.
+
+    The scanner queues lists of events; the honeypots queue single events.
+    """
+    batch: list[dict[str, Any]] = []
+    item = q.get()
+    while True:
+        if isinstance(item, list):
+            batch.extend(item)
+        else:
+            batch.append(item)
+        if len(batch) >= EVENT_BATCH_MAX:
+            return batch
+        try:
+            item = q.get_nowait()
+        except queue.Empty:
+            return batch
+
+
 def format_action(action: dict[str, Any]) -> str:
     source = str(action.get("source", "unknown"))
     severity = str(action.get("severity", "low")).upper()
@@ -151,7 +188,7 @@ def main() -> int:
     except OSError as exc:
         return _fail_bind_help(int(args.listen_port), exc)
 
-    q: "queue.Queue[dict[str, Any]]" = queue.Queue()
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=EVENT_QUEUE_MAX)
     ftp_server = None
     ftp_honeypot.LISTEN_PORT = int(args.ftp_port)
     try:
@@ -187,15 +224,15 @@ def main() -> int:
 
     try:
         while True:
-            event = q.get()
-            if args.show_events:
-                print("[event]", json.dumps(event, separators=(",", ":"), sort_keys=True), flush=True)
-
-            actions = build_defense_actions(event)
-            for action in actions:
-                print("[action]", format_action(action), flush=True)
-
-            time.sleep(0.001)
+            batch = next_batch(q)
+            for event in batch:
+                if args.show_events:
+                    print("[event]", event_json(event))
+
+                actions = build_defense_actions(event)
+                for action in actions:
+                    print("[action]", format_action(action))
+            sys.stdout.flush()  # once per batch rather than once per line
     except KeyboardInterrupt:
         print("\n[main] shutting down", flush=True)
     finally:
@@ -1,12 +1,21 @@
 from scapy.all import sniff, ARP, TCP, IP, get_if_list
-from collections import defaultdict
+from scapy.arch.common import compile_filter
+from collections import Counter, defaultdict, deque
+import ctypes
 import json
 import os
 import queue
+import socket
+import struct
 import sys
 import threading
 import time
 
+try:
+    import orjson
+except ImportError:  # optional; only the standalone __main__ output uses it
+    orjson = None
+
 # how many ARP requests from one IP before we care
 ARP_THRESHOLD = 5
 ARP_WINDOW = 10  # seconds
@@ -24,17 +33,40 @@ COOLDOWN = 1
 
 DEBUG = os.getenv("SCANNER_DEBUG", "0").strip() == "1"
 
+# kernel-side filter: ARP who-has plus TCP without ACK (SYN and the
+# FIN/NULL/XMAS probes). established traffic always carries ACK, so the bulk
+# of a busy link never reaches scapy's dissector
+SNIFF_FILTER = "(arp and arp[6:2] = 1) or (tcp and tcp[tcpflags] & tcp-ack = 0)"
+
 # filled in by main.py on startup
 event_queue = None
 
-# track what each IP has been doing
+# events are handed to the queue in batches (a list per put) so a SYN flood
+# doesn't pay a queue lock + consumer wake-up per packet; a batch goes out
+# once it has FLUSH_MAX events or is FLUSH_INTERVAL seconds old
+FLUSH_MAX = 64
+FLUSH_INTERVAL = 0.05
+_pending = []
+_pending_lock = threading.Lock()
+
+# track what each IP has been doing; each window is a deque of timestamps
+# (oldest first) that is trimmed from the left as entries age out. window and
+# cooldown math runs on time.monotonic(); only the emitted event carries
+# wall-clock time
 ip_activity = defaultdict(lambda: {
-    "arp": [],
-    "ports": [],
-    "brute": defaultdict(list),
-    "last_fired": {}
+    "arp": deque(),
+    "ports": deque(),        # (timestamp, port)
+    "port_counts": Counter(),  # hits per port still inside the sweep window
+    "brute": defaultdict(deque),
+    "last_fired": {},
+    "last_seen": 0.0
 })
 
+# sources quiet for longer than every window and cooldown are forgotten, so
+# a long run doesn't keep state for every address it has ever seen
+IDLE_EVICT_SECONDS = 60
+EVICT_INTERVAL = 60
+
 lock = threading.Lock()
 
 
@@ -43,19 +75,21 @@ def debug(msg: str) -> None:
         print(msg, file=sys.stderr, flush=True)
 
 
-def prune(lst, cutoff):
-    return [x for x in lst if x[0] > cutoff]
+def expire(window, cutoff):
+    while window and window[0] <= cutoff:
+        window.popleft()
 
 
-def should_fire(ip, event_type):
-    last = ip_activity[ip]["last_fired"].get(event_type, 0)
-    if time.time() - last < COOLDOWN:
+def should_fire(ip, event_type, now):
+    last_fired = ip_activity[ip]["last_fired"]
+    if now - last_fired.get(event_type, float("-inf")) < COOLDOWN:
         return False
-    ip_activity[ip]["last_fired"][event_type] = time.time()
+    last_fired[event_type] = now
     return True
 
 
 def fire(event_type, src_ip, extra={}):
+    global _pending
     event = {
         "type": event_type,
         "src_ip": src_ip,
@@ -63,65 +97,228 @@ def fire(event_type, src_ip, extra={}):
         **extra
     }
     debug(f"[scanner] {event_type} from {src_ip}")
-    if event_queue:
-        event_queue.put(event)
+    if not event_queue:
+        return
+    with _pending_lock:
+        _pending.append(event)
+        if len(_pending) >= FLUSH_MAX:
+            event_queue.put(_pending)
+            _pending = []
+
+
+def flush():
+    global _pending
+    with _pending_lock:
+        if _pending:
+            # put under the lock so batches reach the queue in order
+            event_queue.put(_pending)
+            _pending = []
+
+
+def evict_idle(now):
+    cutoff = now - IDLE_EVICT_SECONDS
+    brute_cutoff = now - BRUTE_WINDOW
+    with lock:
+        for ip in [ip for ip, activity in ip_activity.items() if activity["last_seen"] <= cutoff]:
+            del ip_activity[ip]
+        # a sweep leaves one brute window per port touched; drop the stale ones
+        for activity in ip_activity.values():
+            brute = activity["brute"]
+            for port in [port for port, hits in brute.items() if not hits or hits[-1] <= brute_cutoff]:
+                del brute[port]
+
+
+def flush_loop():
+    next_evict = time.monotonic() + EVICT_INTERVAL
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+        now = time.monotonic()
+        if now >= next_evict:
+            evict_idle(now)
+            next_evict = now + EVICT_INTERVAL
+
+
+def on_arp_request(src, target, now):
+    # arp scan detection
+    with lock:
+        activity = ip_activity[src]
+        activity["last_seen"] = now
+        activity["arp"].append(now)
+        expire(activity["arp"], now - ARP_WINDOW)
+
+        if len(activity["arp"]) >= ARP_THRESHOLD:
+            if should_fire(src, "arp.scan", now):
+                fire("arp.scan", src, {
+                    "count": len(activity["arp"]),
+                    "target": target
+                })
+
+
+def on_tcp_probe(src, dport, syn, now):
+    with lock:
+        activity = ip_activity[src]
+        activity["last_seen"] = now
+
+        # track every port this ip touches
+        ports = activity["ports"]
+        port_counts = activity["port_counts"]
+        ports.append((now, dport))
+        port_counts[dport] += 1
+        cutoff = now - SWEEP_WINDOW
+        while ports[0][0] <= cutoff:
+            _, old = ports.popleft()
+            port_counts[old] -= 1
+            if not port_counts[old]:
+                del port_counts[old]
+        distinct = len(port_counts)
+
+        # port sweep
+        if distinct >= SWEEP_THRESHOLD:
+            if should_fire(src, "port.sweep", now):
+                fire("port.sweep", src, {
+                    "ports": list(port_counts),
+                    "count": distinct
+                })
+
+        # brute force - same port over and over
+        if syn:
+            hits = activity["brute"][dport]
+            hits.append(now)
+            expire(hits, now - BRUTE_WINDOW)
+
+            if len(hits) >= BRUTE_THRESHOLD:
+                if should_fire(src, f"brute.{dport}", now):
+                    fire("brute.force", src, {
+                        "port": dport,
+                        "count": len(hits)
+                    })
+
+        # always fire a connect event so the TUI can track it
+        if syn:
+            fire("connect.attempt", src, {"port": dport})
 
 
 def handle_packet(pkt):
-    now = time.time()
+    now = time.monotonic()
 
-    # arp scan detection
     if ARP in pkt and pkt[ARP].op == 1:  # op 1 = who-has (request)
-        src = pkt[ARP].psrc
-        with lock:
-            activity = ip_activity[src]
-            activity["arp"].append((now,))
-            activity["arp"] = prune(activity["arp"], now - ARP_WINDOW)
-
-            if len(activity["arp"]) >= ARP_THRESHOLD:
-                if should_fire(src, "arp.scan"):
-                    fire("arp.scan", src, {
-                        "count": len(activity["arp"]),
-                        "target": pkt[ARP].pdst
-                    })
+        on_arp_request(pkt[ARP].psrc, pkt[ARP].pdst, now)
 
     # tcp stuff
     if IP in pkt and TCP in pkt:
-        src = pkt[IP].src
-        dport = pkt[TCP].dport
         flags = pkt[TCP].flags
 
-        with lock:
-            activity = ip_activity[src]
-
-            # track every port this ip touches
-            activity["ports"].append((now, dport))
-            activity["ports"] = prune(activity["ports"], now - SWEEP_WINDOW)
-            distinct = set(p for _, p in activity["ports"])
-
-            # port sweep
-            if len(distinct) >= SWEEP_THRESHOLD:
-                if should_fire(src, "port.sweep"):
-                    fire("port.sweep", src, {
-                        "ports": list(distinct),
-                        "count": len(distinct)
-                    })
-
-            # brute force - same port over and over
-            if "S" in flags and "A" not in flags:  # SYN only
-                activity["brute"][dport].append((now,))
-                activity["brute"][dport] = prune(activity["brute"][dport], now - BRUTE_WINDOW)
-
-                if len(activity["brute"][dport]) >= BRUTE_THRESHOLD:
-                    if should_fire(src, f"brute.{dport}"):
-                        fire("brute.force", src, {
-                            "port": dport,
-                            "count": len(activity["brute"][dport])
-                        })
-
-            # always fire a connect event so the TUI can track it
-            if "S" in flags and "A" not in flags:
-                fire("connect.attempt", src, {"port": dport})
+        # same cut as SNIFF_FILTER, for when it couldn't be installed:
+        # ACKed segments belong to established connections, not probes
+        if "A" in flags:
+            return
+
+        on_tcp_probe(pkt[IP].src, pkt[TCP].dport, "S" in flags, now)
+
+
+# --- raw AF_PACKET capture (Linux) ---
+# the handlers only need a few header fields, so on Ethernet-framed links we
+# read frames straight off an AF_PACKET socket and slice those fields out,
+# skipping scapy's per-packet layer objects. other platforms/links use sniff()
+
+ETH_P_ALL = 0x0003
+ARPHRD_ETHER = 1
+ARPHRD_LOOPBACK = 772
+SO_ATTACH_FILTER = 26
+PACKET_OUTGOING = 4
+FRAME_SNAPLEN = 128  # ethernet + max ipv4 header + the tcp fields we read
+IP_NAME_CACHE_MAX = 65536
+
+# packed IPv4 -> interned dotted string, so a busy source is formatted once
+# and every ip_activity lookup for it hits the same str object
+_ip_names = {}
+
+
+def ip_name(packed):
+    name = _ip_names.get(packed)
+    if name is None:
+        if len(_ip_names) >= IP_NAME_CACHE_MAX:
+            _ip_names.clear()
+        name = _ip_names[packed] = sys.intern(socket.inet_ntoa(packed))
+    return name
+
+# SNIFF_FILTER as classic BPF (what `tcpdump -dd` emits for it), so the kernel
+# drops everything else before it is copied to us: (code, jt, jf, k)
+RAW_FILTER = (
+    (0x28, 0, 0, 12),        # ldh [12]            ethertype
+    (0x15, 0, 2, 0x0806),    # jeq ARP
+    (0x28, 0, 0, 20),        # ldh [20]            arp op
+    (0x15, 8, 9, 1),         # jeq who-has -> accept / reject
+    (0x15, 0, 8, 0x0800),    # jeq IPv4
+    (0x30, 0, 0, 23),        # ldb [23]            ip proto
+    (0x15, 0, 6, 6),         # jeq TCP
+    (0x28, 0, 0, 20),        # ldh [20]            frag offset
+    (0x45, 4, 0, 0x1fff),    # jset -> reject non-first fragments
+    (0xb1, 0, 0, 14),        # ldxb 4*([14]&0xf)   ip header length
+    (0x50, 0, 0, 27),        # ldb [x + 27]        tcp flags
+    (0x45, 1, 0, 0x10),      # jset ACK -> reject
+    (0x06, 0, 0, 0x40000),   # accept
+    (0x06, 0, 0, 0),         # reject
+)
+
+
+def open_raw_socket(interface):
+    """AF_PACKET socket on interface with RAW_FILTER attached, or None."""
+    if not hasattr(socket, "AF_PACKET"):
+        return None
+    try:
+        with open(f"/sys/class/net/{interface}/type", encoding="ascii") as f:
+            if int(f.read()) not in (ARPHRD_ETHER, ARPHRD_LOOPBACK):
+                return None
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+    except (OSError, ValueError):
+        return None
+    try:
+        prog = b"".join(struct.pack("HBBI", *insn) for insn in RAW_FILTER)
+        buf = ctypes.create_string_buffer(prog)
+        fprog = struct.pack("HL", len(RAW_FILTER), ctypes.addressof(buf))
+        sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+        sock.bind((interface, 0))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def handle_frame(frame, now):
+    ethertype = frame[12:14]
+
+    if ethertype == b"\x08\x06":
+        # who-has, Ethernet/IPv4 addresses only (hlen 6, plen 4), not truncated
+        if len(frame) >= 42 and frame[18] == 6 and frame[19] == 4 and frame[20:22] == b"\x00\x01":
+            on_arp_request(ip_name(frame[28:32]), ip_name(frame[38:42]), now)
+
+    elif ethertype == b"\x08\x00" and len(frame) >= 34 and frame[23] == 6:  # IPv4 / TCP
+        if (frame[20] & 0x1f) or frame[21]:
+            return  # not the first fragment: no TCP header here
+        tcp = 14 + (frame[14] & 0x0F) * 4
+        if len(frame) < tcp + 14:
+            return
+        flags = frame[tcp + 13]
+        if flags & 0x10:  # ACK, see handle_packet
+            return
+        dport = (frame[tcp + 2] << 8) | frame[tcp + 3]
+        on_tcp_probe(ip_name(frame[26:30]), dport, bool(flags & 0x02), now)
+
+
+def raw_sniff(sock):
+    recvfrom = sock.recvfrom
+    clock = time.monotonic
+    while True:
+        frame, addr = recvfrom(FRAME_SNAPLEN)
+        if addr[2] == PACKET_OUTGOING:
+            continue  # our own replies
+        try:
+            handle_frame(frame, clock())
+        except Exception as exc:  # noqa: BLE001
+            # one malformed frame must not take the capture thread down
+            debug(f"[scanner] skipped malformed frame: {exc}")
 
 
 def start(interface, q):
@@ -133,15 +330,38 @@ def start(interface, q):
             f"Interface '{interface}' not found. Available: {', '.join(get_if_list())}"
         )
 
+    sock = open_raw_socket(interface)
+    if sock is not None:
+        def raw_loop():
+            try:
+                raw_sniff(sock)
+            except Exception as exc:  # noqa: BLE001
+                print(f"[scanner] capture failed: {exc}", file=sys.stderr, flush=True)
+                raise
+
+        threading.Thread(target=raw_loop, daemon=True).start()
+        threading.Thread(target=flush_loop, daemon=True).start()
+        debug(f"[scanner] listening on {interface} (AF_PACKET)")
+        return
+
+    # compiling needs libpcap or tcpdump; without either, sniff unfiltered
+    bpf = SNIFF_FILTER
+    try:
+        compile_filter(bpf, iface=interface)
+    except Exception as exc:  # noqa: BLE001
+        print(f"[scanner] BPF filter unavailable ({exc}); filtering in Python", file=sys.stderr, flush=True)
+        bpf = None
+
     def sniff_loop():
         try:
-            sniff(iface=interface, prn=handle_packet, store=False)
+            sniff(iface=interface, prn=handle_packet, store=False, filter=bpf)
         except Exception as exc:  # noqa: BLE001
             print(f"[scanner] sniff failed: {exc}", file=sys.stderr, flush=True)
             raise
 
     t = threading.Thread(target=sniff_loop, daemon=True)
     t.start()
+    threading.Thread(target=flush_loop, daemon=True).start()
     debug(f"[scanner] listening on {interface}")
 
 
@@ -149,8 +369,14 @@ if __name__ == "__main__":
     q = queue.Queue()
     iface = sys.argv[1] if len(sys.argv) > 1 else "eth0"
     start(iface, q)
+    out = sys.stdout.buffer
     try:
         while True:
-            print(json.dumps(q.get(), separators=(",", ":"), sort_keys=True), flush=True)
+            batch = q.get()
+            if orjson is not None:
+                out.write(b"".join(orjson.dumps(ev, option=orjson.OPT_SORT_KEYS) + b"\n" for ev in batch))
+            else:
+                out.write("".join(json.dumps(ev, separators=(",", ":"), sort_keys=True) + "\n" for ev in batch).encode())
+            out.flush()
     except KeyboardInterrupt:
         pass
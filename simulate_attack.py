@@ -20,6 +20,8 @@ Usage
     python3 simulate_attack.py --preset light           # 20 events  → YELLOW
     python3 simulate_attack.py --log-file /tmp/ghostwall/cowrie.json
     python3 simulate_attack.py --events 100 --ips 8 --delay 0.1
+    python3 simulate_attack.py --preset heavy --no-delay   # write as fast as possible
+    python3 simulate_attack.py --preset heavy --no-delay --quiet   # summary only
 
 Presets
 -------
@@ -30,13 +32,18 @@ Presets
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
 import random
 import subprocess
 import sys
 import time
-from datetime import datetime, timezone
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
 # ---------------------------------------------------------------------------
 # Attack data
@@ -77,12 +84,28 @@ DEFAULT_LOCAL = "/tmp/ghostwall/cowrie.json"
 # Helpers – event builders
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=2)
+def _ts_prefix(second: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.", time.gmtime(second))
+
+
 def ts_now() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")
+    # only the microseconds change between events; the date/time part is
+    # formatted once per wall-clock second
+    now = time.time()
+    second = int(now)
+    return f"{_ts_prefix(second)}{int((now - second) * 1_000_000):06d}"
+
+
+def encode_event(ev: dict) -> bytes:
+    """One event as a compact JSON line, trailing newline included."""
+    if orjson is not None:
+        return orjson.dumps(ev, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(ev, separators=(",", ":")) + "\n").encode()
 
 
 def make_session_id() -> str:
-    return "".join(random.choices("0123456789abcdef", k=16))
+    return f"{random.getrandbits(64):016x}"
 
 
 def connect_event(ip: str, session: str) -> dict:
@@ -126,51 +149,115 @@ def disconnect_event(ip: str, session: str) -> dict:
     }
 
 
+_LABELS = {
+    "cowrie.session.connect": "connect      ",
+    "cowrie.login.failed":    "failed_auth  ",
+    "cowrie.command.input":   "command      ",
+    "cowrie.session.closed":  "disconnect   ",
+}
+
+
+def progress_label(ev: dict) -> str:
+    """Progress-line text for one event (only built when progress is shown)."""
+    label = f"{_LABELS[ev['eventid']]} {ev['src_ip']}"
+    if "username" in ev:
+        return f"{label}  user={ev['username']}"
+    if "input" in ev:
+        return f"{label}  cmd={ev['input'][:30]}"
+    return label
+
+
 # ---------------------------------------------------------------------------
 # Helpers – write modes
 # ---------------------------------------------------------------------------
 
-def docker_available() -> bool:
-    """Return True if the Docker daemon is reachable."""
-    result = subprocess.run(
-        ["docker", "info"],
-        capture_output=True,
-        timeout=3,
-    )
-    return result.returncode == 0
-
-
 def check_container(container: str) -> bool:
-    result = subprocess.run(
-        ["docker", "inspect", "--format", "{{.State.Running}}", container],
-        capture_output=True, text=True,
-    )
+    """Return True if the container is running.
+
+    One `docker inspect` answers both questions: it fails the same way when
+    the daemon is down, so there is no separate `docker info` round-trip.
+    """
+    try:
+        result = subprocess.run(
+            ["docker", "inspect", "--format", "{{.State.Running}}", container],
+            capture_output=True, text=True, timeout=3,
+        )
+    except (OSError, subprocess.TimeoutExpired):  # no docker CLI, or a hung daemon
+        return False
     return result.returncode == 0 and result.stdout.strip() == "true"
 
 
-def append_via_docker(container: str, line: str) -> bool:
-    """Write one JSON line to the Cowrie log inside the container."""
-    escaped = line.replace("'", "'\\''")
-    result = subprocess.run(
-        ["docker", "exec", container, "sh", "-c",
-         f"echo '{escaped}' >> {DOCKER_LOG}"],
-        capture_output=True, text=True,
+def open_docker_log(container: str) -> subprocess.Popen:
+    """Start one `docker exec` that appends its stdin to the Cowrie log.
+
+    The container is entered once per run; each event is then only a write
+    to the pipe (see append_via_docker).
+    """
+    return subprocess.Popen(
+        ["docker", "exec", "-i", container, "sh", "-c", f"cat >> {DOCKER_LOG}"],
+        stdin=subprocess.PIPE, bufsize=1 << 16,
     )
-    return result.returncode == 0
 
 
-def append_to_local_file(log_path: str, line: str) -> bool:
-    """Write one JSON line directly to a local file."""
+def append_via_docker(proc: subprocess.Popen, line: bytes) -> bool:
+    """Write one JSON line to the container's log pipe."""
     try:
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        with open(log_path, "a") as fh:
-            fh.write(line + "\n")
+        proc.stdin.write(line)
         return True
-    except Exception as exc:
-        print(f"  ERROR writing to {log_path}: {exc}")
+    except OSError as exc:
+        print(f"  ERROR writing via docker exec: {exc}")
         return False
 
 
+def flush_docker_log(proc: subprocess.Popen) -> bool:
+    """Push buffered lines into the log pipe; False if the exec has gone away."""
+    try:
+        proc.stdin.flush()
+        return True
+    except OSError as exc:
+        print(f"  ERROR writing via docker exec: {exc}")
+        return False
+
+
+def close_docker_log(proc: subprocess.Popen) -> bool:
+    """Flush and close the log pipe; True if the exec exited cleanly."""
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    try:
+        return proc.wait(timeout=5) == 0
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        return False
+
+
+LOCAL_BATCH = 32  # lines per writev() in local mode when --delay is 0
+PROGRESS_BATCH = 16  # progress lines per stdout write when --delay is 0
+
+
+def append_to_local_file(fd: int, pending: list[bytes], line: bytes) -> bool:
+    """Queue one JSON line for the local log; written LOCAL_BATCH at a time."""
+    pending.append(line)
+    if len(pending) >= LOCAL_BATCH:
+        return flush_local_file(fd, pending)
+    return True
+
+
+def flush_local_file(fd: int, pending: list[bytes]) -> bool:
+    """Append every queued line to the open log fd with a single writev()."""
+    if not pending:
+        return True
+    try:
+        os.writev(fd, pending)
+        return True
+    except OSError as exc:
+        print(f"  ERROR writing {len(pending)} events to log: {exc}")
+        return False
+    finally:
+        pending.clear()
+
+
 # ---------------------------------------------------------------------------
 # Simulation
 # ---------------------------------------------------------------------------
@@ -182,6 +269,7 @@ def run_simulation(
     delay: float,
     container: str | None,   # None → local mode
     log_file: str | None,    # used in local mode
+    quiet: bool = False,     # skip per-event progress lines
 ) -> None:
     local_mode = container is None
     target = log_file if local_mode else f"{container}:{DOCKER_LOG}"
@@ -200,9 +288,9 @@ def run_simulation(
     # write events so every line is treated as new.
     if local_mode:
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        # Touch the file (create empty if absent, leave content if present)
-        with open(log_file, "a"):
-            pass
+        # Touch the file (create empty if absent, leave content if present);
+        # the fd stays open for the whole run
+        fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
     else:
         subprocess.run(
             ["docker", "exec", container, "sh", "-c",
@@ -217,19 +305,24 @@ def run_simulation(
     sent = 0
     failed = 0
 
-    for i in range(n_events):
-        ip = random.choice(ips)
+    pending: list[bytes] = []
+    progress: list[str] = []
+    proc = None if local_mode else open_docker_log(container)
 
+    start = time.monotonic()
+    # draw the whole attacker sequence up front rather than once per event
+    for i, ip in enumerate(random.choices(ips, k=n_events), 1):
         # Start or rotate session for this IP
         if ip not in sessions or random.random() < 0.15:
             sessions[ip] = make_session_id()
             ev   = connect_event(ip, sessions[ip])
-            line = json.dumps(ev)
-            ok   = (append_to_local_file(log_file, line) if local_mode
-                    else append_via_docker(container, line))
+            line = encode_event(ev)
+            ok   = (append_to_local_file(fd, pending, line) if local_mode
+                    else append_via_docker(proc, line))
             if ok:
                 sent += 1
-                print(f"  [{sent:>3}] connect       {ip}")
+                if not quiet:
+                    progress.append(f"  [{sent:>3}] {progress_label(ev)}\n")
             else:
                 failed += 1
 
@@ -238,30 +331,57 @@ def run_simulation(
         # 70% failed auth, 20% command, 10% disconnect
         roll = random.random()
         if roll < 0.70:
-            ev    = failed_auth_event(ip, session)
-            label = f"failed_auth   {ip}  user={ev['username']}"
+            ev = failed_auth_event(ip, session)
         elif roll < 0.90:
-            ev    = command_event(ip, session)
-            label = f"command       {ip}  cmd={ev['input'][:30]}"
+            ev = command_event(ip, session)
         else:
-            ev    = disconnect_event(ip, session)
+            ev = disconnect_event(ip, session)
             del sessions[ip]
-            label = f"disconnect    {ip}"
 
-        line = json.dumps(ev)
-        ok   = (append_to_local_file(log_file, line) if local_mode
-                else append_via_docker(container, line))
+        line = encode_event(ev)
+        ok   = (append_to_local_file(fd, pending, line) if local_mode
+                else append_via_docker(proc, line))
         if ok:
             sent += 1
-            print(f"  [{sent:>3}] {label}")
+            if not quiet:
+                progress.append(f"  [{sent:>3}] {progress_label(ev)}\n")
         else:
             failed += 1
 
+        if progress and (delay > 0 or len(progress) >= PROGRESS_BATCH):
+            sys.stdout.write("".join(progress))
+            sys.stdout.flush()
+            progress.clear()
+
         if delay > 0:
-            time.sleep(delay)
+            # paced run: hand each event over as it happens
+            if local_mode:
+                if not flush_local_file(fd, pending):
+                    failed += 1
+            elif not flush_docker_log(proc):
+                # the exec is gone; stop and let close_docker_log reap it
+                failed += 1
+                break
+            # sleep until this event's slot on a fixed schedule, so a slow
+            # write eats into the next pause instead of delaying every later event
+            wait = start + i * delay - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+    sys.stdout.write("".join(progress))
+
+    if local_mode:
+        if not flush_local_file(fd, pending):
+            failed += 1
+        os.close(fd)
+    elif not close_docker_log(proc):
+        print("  ERROR: docker exec did not exit cleanly; events may be missing.")
+        failed += 1
 
     print()
-    print(f"  Done. Sent {sent} events, {failed} failed.")
+    # lines count as sent once buffered or queued for the log; a failed
+    # flush or close is counted once, however many lines it dropped
+    print(f"  Done. Sent {sent} events (buffered or queued), {failed} failed.")
     print(f"  Score should rise within ~10 seconds.")
     print()
 
@@ -289,6 +409,10 @@ def main() -> None:
     parser.add_argument("--ips",    type=int, choices=[3, 6, 12],
                         help="Override number of fake IPs")
     parser.add_argument("--delay",  type=float, help="Seconds between events")
+    parser.add_argument("--no-delay", action="store_true",
+                        help="Write events back to back (same as --delay 0)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only print the summary, not a line per event")
     parser.add_argument(
         "--container", default="ghostwall-cowrie",
         help="Cowrie Docker container name (default: ghostwall-cowrie)",
@@ -307,6 +431,7 @@ def main() -> None:
     if args.events:           cfg["events"] = args.events
     if args.ips:              cfg["ips"]    = args.ips
     if args.delay is not None: cfg["delay"] = args.delay
+    if args.no_delay:         cfg["delay"]  = 0
 
     ip_pool = IP_POOLS.get(cfg["ips"], IP_POOLS[6])
 
@@ -316,7 +441,7 @@ def main() -> None:
         container = None
         log_file  = args.log_file
         print(f"  Using local file mode: {log_file}")
-    elif docker_available() and check_container(args.container):
+    elif check_container(args.container):
         # Docker is up and container is running → use docker exec
         container = args.container
         log_file  = None
@@ -334,6 +459,7 @@ def main() -> None:
         delay=cfg["delay"],
         container=container,
         log_file=log_file,
+        quiet=args.quiet,
     )
 
 
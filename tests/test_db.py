@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app import db
+
+
+class TestFetchRecentEvents(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(db, "DB_PATH", str(Path(tmp.name) / "shield.db"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        await db.init_db()
+        self.addAsyncCleanup(db.close_db)
+        await db.insert_events_bulk(
+            [(1000.0 + idx, "192.0.2.1", "login.failed", db.dumps_meta({})) for idx in range(10)]
+        )
+
+    async def test_since_id_pages_oldest_first_without_gaps(self) -> None:
+        seen: list[int] = []
+        since_id = 2
+        while True:
+            rows = await db.fetch_recent_events(limit=3, since_id=since_id)
+            if not rows:
+                break
+            seen.extend(r["id"] for r in rows)
+            since_id = max(r["id"] for r in rows)
+        self.assertEqual(seen, list(range(3, 11)))
+
+    async def test_default_returns_newest_events(self) -> None:
+        rows = await db.fetch_recent_events(limit=3)
+        self.assertEqual([r["ts"] for r in rows], [1009.0, 1008.0, 1007.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
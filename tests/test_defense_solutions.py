@@ -35,6 +35,15 @@ class TestDefenseSolutions(unittest.TestCase):
         self.assertGreater(len(first), 0)
         self.assertEqual(second, [])
 
+    def test_engine_skips_non_actionable_types(self) -> None:
+        event = {
+            "type": "fssh.route",
+            "src_ip": "10.1.1.11",
+            "port": 22,
+            "timestamp": 2500.0,
+        }
+        self.assertEqual(build_defense_actions(event), [])
+
     def test_ssh_escalation(self) -> None:
         defense = SSHDefense()
         src = "192.168.1.100"
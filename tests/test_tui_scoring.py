@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import tempfile
+import time
 import unittest
+from pathlib import Path
 
-from TUI.tui import DashboardState
+from TUI.tui import DashboardState, parse_cowrie_line, parse_event_line
 
 
 class TestTuiThreatScoring(unittest.TestCase):
@@ -21,7 +24,7 @@ class TestTuiThreatScoring(unittest.TestCase):
                 }
             )
 
-        latest = int(state.recent_logs[0]["score"])
+        latest = state.log_score[-1]
         self.assertGreaterEqual(latest, 50)
         self.assertGreaterEqual(state.average_weighted_threat(), 40.0)
 
@@ -40,10 +43,151 @@ class TestTuiThreatScoring(unittest.TestCase):
                 }
             )
 
-        latest = int(state.recent_logs[0]["score"])
+        latest = state.log_score[-1]
         self.assertGreaterEqual(latest, 55)
         self.assertGreaterEqual(state.average_weighted_threat(), 40.0)
 
+    def test_window_counters_expire_old_events(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources={"10.0.0.1"})
+        now = time.time()
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.7", "port": 22, "timestamp": now - 120})
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.8", "port": 22, "timestamp": now - 45})
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.8", "port": 80, "timestamp": now - 1})
+        state.add_event({"type": "connect.attempt", "src_ip": "10.0.0.1", "port": 22, "timestamp": now})
+
+        self.assertEqual(state.current_attack_count(), 2)
+        self.assertEqual(state.active_source_count(), 1)
+
+    def test_late_events_are_not_counted_as_current(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources=set())
+        now = time.time()
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.7", "port": 22, "timestamp": now - 10})
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.7", "port": 22, "timestamp": now})
+        # Backfilled: one between the live buckets, one older than every bucket.
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.8", "port": 22, "timestamp": now - 5})
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.9", "port": 22, "timestamp": now - 300})
+
+        self.assertEqual(state.current_attack_count(now=now + 27), 1)
+        self.assertEqual(state.active_source_count(now=now), 2)
+
+    def test_late_event_inside_window_is_counted(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources=set())
+        now = time.time()
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.7", "port": 22, "timestamp": now})
+        state.add_event({"type": "connect.attempt", "src_ip": "203.0.113.8", "port": 22, "timestamp": now - 5})
+
+        self.assertEqual(state.current_attack_count(now=now), 2)
+        self.assertEqual(state.active_source_count(now=now), 2)
+        self.assertEqual(state.current_attack_count(now=now + 28), 1)
+
+    def test_closed_session_reuses_ingest_scores(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources=set())
+        for idx in range(8):
+            state.add_event(
+                {
+                    "type": "connect.attempt",
+                    "src_ip": "192.0.2.50",
+                    "port": 22,
+                    "timestamp": 3000.0 + idx,
+                }
+            )
+        ingest_scores = list(state.recent_scores)
+
+        # Events were just ingested, however old their timestamps are.
+        self.assertIsNone(state.maybe_close_attack_session())
+        session = state.maybe_close_attack_session(mono=time.monotonic() + 60.0)
+        self.assertIsNotNone(session)
+        self.assertEqual(session["event_count"], 8)
+        self.assertEqual(session["max_threat"], max(ingest_scores))
+        self.assertAlmostEqual(session["avg_threat"], sum(ingest_scores) / len(ingest_scores))
+        self.assertEqual(session["top_source"], "192.0.2.50")
+        self.assertEqual(session["ports_touched"], [22])
+        self.assertEqual(session["event_type_breakdown"], {"connect.attempt": 8})
+        self.assertIsNone(state.maybe_close_attack_session(mono=time.monotonic() + 60.0))
+
+    def test_log_lines_flushed_on_close(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = Path(tmp) / "logs" / "tui.txt"
+            state = DashboardState(log_file=log_path, trusted_sources=set())
+            for idx in range(5):
+                state.add_event({"type": "arp.scan", "src_ip": "192.0.2.9", "timestamp": 4000.0 + idx})
+            state.close()
+
+            lines = log_path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 5)
+            self.assertTrue(lines[0].startswith("4000 id=1 src=192.0.2.9 event=arp.scan"))
+
+    def test_close_returns_when_log_file_cannot_open(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            blocker = Path(tmp) / "blocker"
+            blocker.write_text("", encoding="utf-8")
+            state = DashboardState(log_file=blocker / "tui.txt", trusted_sources=set())
+            state._log_writer.join(timeout=2.0)
+            for idx in range(20):
+                state.add_event({"type": "arp.scan", "src_ip": "192.0.2.9", "timestamp": 4000.0 + idx})
+            state.close()
+
+            self.assertTrue(state._log_q.empty())
+
+    def test_card_versions_track_changes(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources=set())
+        state.add_event({"type": "fssh.status", "timestamp": 5000.0})
+        self.assertEqual((state.logs_version, state.ports_version), (1, 0))
+
+        state.add_event({"type": "connect.attempt", "src_ip": "192.0.2.77", "port": 21, "timestamp": 5001.0})
+        self.assertEqual((state.logs_version, state.ports_version), (2, 1))
+
+        actions_version = state.actions_version
+        state.add_actions([])
+        self.assertEqual(state.actions_version, actions_version)
+
+        debrief_version = state.debrief_version
+        state.set_debrief_summary(state.debrief["summary"])
+        self.assertEqual(state.debrief_version, debrief_version)
+        state.set_debrief_summary("changed")
+        self.assertEqual(state.debrief_version, debrief_version + 1)
+
+    def test_top_ports_and_event_type_follow_new_events(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources=set())
+        state.add_event({"type": "connect.attempt", "src_ip": "192.0.2.80", "port": 21, "timestamp": 6000.0})
+        self.assertEqual(state.top_ports(), [(21, 1, "FTP decoy")])
+        self.assertEqual(state.snapshot()["top_event_type"], "connect.attempt")
+
+        for ts in (6001.0, 6002.0):
+            state.add_event({"type": "arp.scan", "src_ip": "192.0.2.80", "port": 22, "timestamp": ts})
+        self.assertEqual(state.top_ports(), [(22, 2, "SSH real"), (21, 1, "FTP decoy")])
+        self.assertEqual(state.top_ports(count=1), [(22, 2, "SSH real")])
+        self.assertEqual(state.snapshot()["top_event_type"], "arp.scan")
+
+    def test_top_event_type_tie_keeps_first_counted_type(self) -> None:
+        state = DashboardState(log_file=None, trusted_sources=set())
+        for idx, event_type in enumerate(("fssh.status", "arp.scan", "arp.scan", "fssh.status")):
+            state.add_event({"type": event_type, "src_ip": "192.0.2.81", "timestamp": 6100.0 + idx})
+        self.assertEqual(state.snapshot()["top_event_type"], state.event_counts.most_common(1)[0][0])
+        self.assertEqual(state.snapshot()["top_event_type"], "fssh.status")
+
+
+class TestTuiEventParsing(unittest.TestCase):
+    def test_json_event_line(self) -> None:
+        event = parse_event_line('{"type": "arp.scan", "src_ip": "192.0.2.1", "count": 5}\n')
+        self.assertEqual(event, {"type": "arp.scan", "src_ip": "192.0.2.1", "count": 5})
+
+    def test_dict_literal_requires_legacy_parse(self) -> None:
+        line = "{'type': 'ftp.honeypot', 'src_ip': '192.0.2.2'}"
+        self.assertIsNone(parse_event_line(line))
+        self.assertEqual(parse_event_line(line, legacy=True), {"type": "ftp.honeypot", "src_ip": "192.0.2.2"})
+
+    def test_cowrie_line_maps_known_and_unknown_eventids(self) -> None:
+        event = parse_cowrie_line(
+            '{"eventid": "cowrie.command.input", "src_ip": "192.0.2.3", "dst_port": 2222, "input": "uname -a"}'
+        )
+        self.assertEqual(event["type"], "cowrie.command.input")
+        self.assertEqual((event["src_ip"], event["port"], event["command"]), ("192.0.2.3", 2222, "uname -a"))
+
+        event = parse_cowrie_line('{"eventid": "cowrie.client.version", "src_ip": 7, "timestamp": "2024-01-01T00:00:00Z"}')
+        self.assertEqual((event["type"], event["src_ip"], event["port"]), ("cowrie.session.connect", "7", 22))
+        self.assertIsInstance(event["timestamp"], float)
+
 
 if __name__ == "__main__":
     unittest.main()